@@ -30,6 +30,9 @@ class AppConfig:
     # Режим отладки
     debug: bool = False
     
+    # Проверять webhook при старте (не нужно, если бот всегда работает через polling)
+    check_webhook: bool = True
+    
     @classmethod
     def from_env(cls) -> "AppConfig":
         """Создание конфигурации из переменных окружения."""
@@ -55,13 +58,15 @@ class AppConfig:
         
         # Отладочная информация
         debug = os.getenv("DEBUG", "false").lower() in ("true", "1", "yes")
+        check_webhook = os.getenv("CHECK_WEBHOOK", "true").lower() in ("true", "1", "yes")
         
         config = cls(
             bot_token=bot_token,
             database=database_config,
             max_users_per_instance=int(os.getenv("MAX_USERS", "1000")),
             max_alerts_per_user=int(os.getenv("MAX_ALERTS_PER_USER", "50")),
-            debug=debug
+            debug=debug,
+            check_webhook=check_webhook
         )
         
         # Выводим информацию о конфигурации
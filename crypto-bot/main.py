@@ -131,7 +131,7 @@ class FullyFunctionalCryptoBot:
         
         # Telegram Service
         try:
-            self.telegram_service = TelegramService(self.config.bot_token)
+            self.telegram_service = TelegramService(self.config.bot_token, check_webhook=self.config.check_webhook)
             logger.info("✅ Telegram service created")
             self._startup_stats["modules_started"] += 1
         except Exception as e:
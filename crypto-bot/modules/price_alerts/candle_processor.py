@@ -330,7 +330,7 @@ class CandleProcessor:
         return {
             "running": self._running,
             "queue_size": self._candle_queue.qsize(),
-            "workers": len([t for t in self._processing_tasks if not t.done()]),
+            "workers": sum(1 for t in self._processing_tasks if not t.done()),
             "preset_cache_size": len(self._preset_cache),
             "btc_cache_size": len(self._price_cache['BTCUSDT']),
             "eth_cache_size": len(self._price_cache['ETHUSDT']),
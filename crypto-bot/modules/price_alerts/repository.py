@@ -3,8 +3,9 @@
 
 import time
 import json
-from typing import List, Optional, Dict, Any
-from uuid import UUID
+from operator import itemgetter
+from typing import List, Optional, Dict, Any, Tuple
+from uuid import UUID, uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from sqlalchemy.exc import SQLAlchemyError
@@ -29,6 +30,9 @@ class PriceAlertsRepository:
         # Глобальный кеш активных пресетов для быстрого доступа
         self._active_presets_cache: Dict[str, Dict[str, Any]] = {}  # preset_id -> preset_data
         self._active_cache_timestamp = 0
+        
+        # Индекс активных пресетов по символу: symbol -> (пороги по возрастанию, пресеты в том же порядке)
+        self._symbol_index: Optional[Dict[str, Tuple[List[float], List[Dict[str, Any]]]]] = None
     
     async def get_user_presets(self, user_id: int) -> List[Dict[str, Any]]:
         """Получение всех пресетов пользователя с кешированием."""
@@ -50,12 +54,15 @@ class PriceAlertsRepository:
                     user_cache = {}
                     
                     for preset in presets:
+                        # pairs хранится JSON-строкой - разбираем один раз на пресет
+                        symbols = json.loads(preset.pairs) if isinstance(preset.pairs, str) else preset.pairs
+                        preset_id = str(preset.preset_id)
                         preset_data = {
-                            'id': str(preset.preset_id),
-                            'preset_id': str(preset.preset_id),
+                            'id': preset_id,
+                            'preset_id': preset_id,
                             'name': preset.preset_name,
-                            'symbols': json.loads(preset.pairs) if isinstance(preset.pairs, str) else preset.pairs,
-                            'symbols_count': len(json.loads(preset.pairs) if isinstance(preset.pairs, str) else preset.pairs),
+                            'symbols': symbols,
+                            'symbols_count': len(symbols),
                             'interval': preset.interval,
                             'percent_threshold': preset.percent,
                             'is_active': preset.is_active,
@@ -63,7 +70,7 @@ class PriceAlertsRepository:
                             'alerts_count': preset.alerts_triggered or 0
                         }
                         presets_data.append(preset_data)
-                        user_cache[str(preset.preset_id)] = preset_data
+                        user_cache[preset_id] = preset_data
                     
                     # Обновляем кеш
                     self._presets_cache[user_id] = user_cache
@@ -110,8 +117,7 @@ class PriceAlertsRepository:
             
             # Если БД недоступна, генерируем ID
             if not preset_id:
-                import uuid
-                preset_id = str(uuid.uuid4())
+                preset_id = str(uuid4())
             
             # Создаем данные для кеша
             cached_preset_data = {
@@ -141,6 +147,7 @@ class PriceAlertsRepository:
                     'user_id': user_id
                 }
                 self._active_cache_timestamp = time.time()
+                self._symbol_index = None
             
             logger.info(f"Created preset {preset_id} for user {user_id}")
             return preset_id
@@ -156,7 +163,7 @@ class PriceAlertsRepository:
             if self.db_manager:
                 try:
                     async with self.db_manager.get_session() as session:
-                        result = await session.execute(
+                        await session.execute(
                             update(PricePreset)
                             .where(PricePreset.preset_id == UUID(preset_id))
                             .values(is_active=is_active)
@@ -181,6 +188,7 @@ class PriceAlertsRepository:
                     self._active_presets_cache.pop(preset_id, None)
                 
                 self._active_cache_timestamp = time.time()
+                self._symbol_index = None
                 
                 logger.info(f"Updated preset {preset_id} status to {is_active}")
                 return True
@@ -197,7 +205,7 @@ class PriceAlertsRepository:
             if self.db_manager:
                 try:
                     async with self.db_manager.get_session() as session:
-                        result = await session.execute(
+                        await session.execute(
                             delete(PricePreset).where(PricePreset.preset_id == UUID(preset_id))
                         )
                         await session.commit()
@@ -213,6 +221,7 @@ class PriceAlertsRepository:
                 # Удаляем из кеша активных пресетов
                 self._active_presets_cache.pop(preset_id, None)
                 self._active_cache_timestamp = time.time()
+                self._symbol_index = None
                 
                 logger.info(f"Deleted preset {preset_id}")
                 return True
@@ -230,6 +239,36 @@ class PriceAlertsRepository:
         
         return self._active_presets_cache.copy()
     
+    async def get_active_presets_by_symbol(self) -> Dict[str, Tuple[List[float], List[Dict[str, Any]]]]:
+        """Активные пресеты, сгруппированные по символу и отсортированные по порогу."""
+        if time.time() - self._active_cache_timestamp > self._cache_ttl:
+            await self._rebuild_active_cache()
+        
+        # Индекс строится лениво и сбрасывается при любом изменении кеша активных пресетов
+        if self._symbol_index is None:
+            grouped: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+            for preset_id, preset_data in self._active_presets_cache.items():
+                # Битый порог не должен ломать проверку алертов всем остальным - пропускаем пресет
+                try:
+                    threshold = float(preset_data.get('percent_threshold', 0))
+                except (TypeError, ValueError):
+                    logger.warning("Preset %s has invalid percent_threshold %r, skipped", preset_id, preset_data.get('percent_threshold'))
+                    continue
+                
+                for symbol in preset_data.get('symbols', []):
+                    grouped.setdefault(symbol, []).append((threshold, preset_data))
+            
+            # Одна сортировка на символ вместо вставки по одному; сравниваются только пороги
+            self._symbol_index = {}
+            for symbol, entries in grouped.items():
+                entries.sort(key=itemgetter(0))
+                self._symbol_index[symbol] = (
+                    [entry[0] for entry in entries],
+                    [entry[1] for entry in entries]
+                )
+        
+        return self._symbol_index
+    
     async def _rebuild_active_cache(self):
         """Перестроение кеша активных пресетов."""
         new_active_cache = {}
@@ -244,6 +283,7 @@ class PriceAlertsRepository:
         
         self._active_presets_cache = new_active_cache
         self._active_cache_timestamp = time.time()
+        self._symbol_index = None
     
     def _is_cache_valid(self, user_id: int) -> bool:
         """Проверка валидности кеша для пользователя."""
@@ -264,6 +304,7 @@ class PriceAlertsRepository:
         self._cache_timestamps.clear()
         self._active_presets_cache.clear()
         self._active_cache_timestamp = 0
+        self._symbol_index = None
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Получение статистики кеша."""
@@ -3,23 +3,61 @@
 
 import asyncio
 import aiohttp
+import random
+from bisect import bisect_right
 import time
-import json
-from typing import Dict, Any, List, Optional, Set
+import orjson
+from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from collections import defaultdict, deque
 import logging
 
-from shared.events import event_bus, Event, PRICE_ALERT_TRIGGERED, PRICE_DATA_UPDATED
+from shared.events import event_bus, Event, AlertPayload, PRICE_ALERT_TRIGGERED, PRICE_DATA_UPDATED
 from shared.utils.rate_limiter import get_rate_limiter
 from .repository import PriceAlertsRepository
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Пауза после неудачных обновлений: экспоненциальный рост с джиттером, не больше 5 минут
+_MAX_BACKOFF = 300
+
+# Вес 24hr ticker в Binance: symbols= до 20 символов - 2, до 100 - 40, больше - 80, как весь рынок
+_SMALL_BATCH_SYMBOLS = 20
+_SMALL_BATCH_WEIGHT = 2
+_BATCH_SYMBOLS = 100
+_BATCH_WEIGHT = 40
+_FULL_MARKET_WEIGHT = 80
+
+# Без активных пресетов и просмотров цен опрашиваем биржу реже
+_IDLE_UPDATE_INTERVAL = 300
+_ACTIVITY_WINDOW = 600
+
+
+def _symbols_request_weight(symbols_count: int) -> int:
+    """Вес запроса 24hr ticker с symbols= для данного числа символов."""
+    if symbols_count <= _SMALL_BATCH_SYMBOLS:
+        return _SMALL_BATCH_WEIGHT
+    if symbols_count <= _BATCH_SYMBOLS:
+        return _BATCH_WEIGHT
+    return _FULL_MARKET_WEIGHT
+
+
+def _use_full_market(symbols_count: int) -> bool:
+    """Запрашивать весь рынок: symbols= стоил бы не меньше по весу."""
+    return _symbols_request_weight(symbols_count) >= _FULL_MARKET_WEIGHT
+
+
+def _backoff_delay(base: float, failures: int) -> float:
+    """Задержка перед повтором после failures неудач подряд."""
+    delay = min(_MAX_BACKOFF, base * (2 ** min(failures, 10)))
+    # Джиттер разводит повторы во времени, чтобы не бить в API синхронно
+    return delay * (0.5 + random.random() / 2)
+
+
+@dataclass(slots=True)
 class PriceData:
-    """Данные о цене."""
+    """Данные о цене (со __slots__ - экземпляр на каждый тикер каждого обновления)."""
     symbol: str
     price: float
     change_24h: float
@@ -86,6 +124,12 @@ class PriceAlertsService:
         self._price_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1440))  # 24 часа по минутам
         self._alerts: Dict[int, List[PriceAlert]] = {}
         
+        # Сериализованные цены: живут до следующего обновления, сбрасываются в _fetch_all_prices
+        self._price_dicts_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        
+        # Отформатированные части текста алерта по символу: symbol -> (timestamp, начало, конец)
+        self._alert_text_cache: Dict[str, Tuple[datetime, str, str]] = {}
+        
         # Rate limiting
         self.rate_limiter = get_rate_limiter('binance_free')
         
@@ -93,6 +137,14 @@ class PriceAlertsService:
         self.monitored_symbols = set()
         self.update_interval = 30  # секунд
         
+        # Символы, которых нет на Binance: в symbols= не отправляем, список сбрасывается раз в час
+        self._rejected_symbols: Set[str] = set()
+        
+        # Адаптивный интервал: частый опрос нужен, только пока есть кому смотреть на цены
+        self._has_active_presets = False
+        self._last_activity = 0.0
+        self._wakeup = asyncio.Event()
+        
         # API конфигурация
         self.api_configs = {
             'binance': {
@@ -139,10 +191,15 @@ class PriceAlertsService:
         
         self.running = True
         
-        # Создаем HTTP сессию
+        # Создаем HTTP сессию: все запросы идут на один хост, держим соединения и DNS подольше
         self._session = aiohttp.ClientSession(
             timeout=aiohttp.ClientTimeout(total=30),
-            connector=aiohttp.TCPConnector(limit=100, limit_per_host=20)
+            connector=aiohttp.TCPConnector(
+                limit=20,
+                limit_per_host=10,
+                ttl_dns_cache=600,
+                keepalive_timeout=60
+            )
         )
         
         # Загружаем данные из репозитория
@@ -161,7 +218,7 @@ class PriceAlertsService:
             source_module="price_alerts"
         ))
         
-        logger.info(f"Price Alerts service started, monitoring {len(self.monitored_symbols)} symbols")
+        logger.info("Price Alerts service started, monitoring %s symbols", len(self.monitored_symbols))
     
     async def stop(self) -> None:
         """Остановка сервиса."""
@@ -189,15 +246,14 @@ class PriceAlertsService:
             for preset_data in active_presets.values():
                 self.monitored_symbols.update(preset_data.get('symbols', []))
             
-            logger.info(f"Loaded {len(active_presets)} active presets from repository")
+            logger.info("Loaded %s active presets from repository", len(active_presets))
             
         except Exception as e:
-            logger.error(f"Error loading from repository: {e}")
+            logger.error("Error loading from repository: %s", e)
     
     async def _monitor_prices(self) -> None:
         """Основной цикл мониторинга цен."""
         consecutive_failures = 0
-        max_failures = 5
         
         while self.running:
             try:
@@ -220,7 +276,7 @@ class PriceAlertsService:
                         self._stats['avg_response_time'] * 0.9 + processing_time * 0.1
                     )
                     
-                    logger.debug(f"Price update completed in {processing_time:.2f}s")
+                    logger.debug("Price update completed in %.2fs", processing_time)
                     
                     # Публикуем событие обновления
                     await event_bus.publish(Event(
@@ -235,22 +291,24 @@ class PriceAlertsService:
                 else:
                     consecutive_failures += 1
                     self._stats['failed_updates'] += 1
-                    logger.warning(f"Failed to fetch prices, failures: {consecutive_failures}")
+                    logger.warning("Failed to fetch prices, failures: %s", consecutive_failures)
                 
                 # Динамический интервал обновления
-                if consecutive_failures == 0:
+                if consecutive_failures:
+                    sleep_time = _backoff_delay(self.update_interval, consecutive_failures)
+                elif self._is_active():
                     sleep_time = self.update_interval
                 else:
-                    sleep_time = min(300, self.update_interval * (1 + consecutive_failures))
+                    sleep_time = _IDLE_UPDATE_INTERVAL
                 
-                await asyncio.sleep(sleep_time)
+                await self._sleep_or_wakeup(sleep_time)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 consecutive_failures += 1
-                logger.error(f"Error in price monitoring: {e}")
-                await asyncio.sleep(min(300, 60 * consecutive_failures))
+                logger.error("Error in price monitoring: %s", e)
+                await asyncio.sleep(_backoff_delay(30, consecutive_failures))
     
     async def _fetch_all_prices(self) -> bool:
         """Получение цен для всех отслеживаемых символов."""
@@ -258,138 +316,214 @@ class PriceAlertsService:
             return True
         
         try:
-            # Проверяем rate limit
-            rate_limit_result = await self.rate_limiter.acquire('binance')
-            if not rate_limit_result.allowed:
-                logger.debug(f"Rate limited, waiting {rate_limit_result.wait_time:.2f}s")
-                await asyncio.sleep(rate_limit_result.wait_time)
+            url = f"{self.api_configs['binance']['base_url']}{self.api_configs['binance']['endpoints']['ticker_24hr']}"
             
-            self._stats['api_calls'] += 1
+            symbols = sorted(self.monitored_symbols - self._rejected_symbols)
+            if not symbols:
+                return True
             
-            # Получаем данные 24hr ticker для всех символов
-            url = f"{self.api_configs['binance']['base_url']}{self.api_configs['binance']['endpoints']['ticker_24hr']}"
+            if _use_full_market(len(symbols)):
+                data = await self._fetch_full_market(url, symbols)
+            else:
+                # Только отслеживаемые символы одним запросом
+                status, data = await self._fetch_tickers(url, symbols)
+                if status == 400:
+                    # Неизвестный Binance символ валит весь запрос - один запрос всего рынка за цикл
+                    logger.warning("Binance rejected symbols request, falling back to full ticker list")
+                    data = await self._fetch_full_market(url, symbols)
+                elif data is None:
+                    logger.warning("Binance API returned %s", status)
             
-            async with self._session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    
-                    # Обрабатываем данные
-                    updated_count = 0
-                    for ticker in data:
-                        symbol = ticker['symbol']
-                        
-                        if symbol in self.monitored_symbols:
-                            price_data = PriceData(
-                                symbol=symbol,
-                                price=float(ticker['lastPrice']),
-                                change_24h=float(ticker['priceChange']),
-                                change_percent_24h=float(ticker['priceChangePercent']),
-                                volume_24h=float(ticker['quoteVolume']),
-                                timestamp=datetime.utcnow(),
-                                source='binance'
-                            )
-                            
-                            # Сохраняем текущую цену
-                            self._current_prices[symbol] = price_data
-                            
-                            # Добавляем в историю
-                            self._price_history[symbol].append({
-                                'timestamp': price_data.timestamp.timestamp(),
-                                'price': price_data.price,
-                                'volume': price_data.volume_24h
-                            })
-                            
-                            updated_count += 1
-                    
-                    logger.debug(f"Updated prices for {updated_count} symbols")
-                    
-                    # Записываем успешный API вызов
-                    await self.rate_limiter.record_api_call('binance', True, time.time())
-                    
-                    return updated_count > 0
-                else:
-                    logger.warning(f"Binance API returned {response.status}")
-                    await self.rate_limiter.record_api_call('binance', False, time.time())
-                    return False
+            if data is None:
+                await self.rate_limiter.record_api_call('binance', False, time.time())
+                return False
+            
+            monitored = self.monitored_symbols
+            tickers = [ticker for ticker in data if ticker['symbol'] in monitored]
+            
+            # Обрабатываем данные
+            current_prices = self._current_prices
+            price_history = self._price_history
+            
+            # Одно время на все обновление: datetime для отображения, epoch для истории
+            now = datetime.utcnow()
+            now_ts = time.time()
+            for ticker in tickers:
+                symbol = ticker['symbol']
+                price_data = PriceData(
+                    symbol,
+                    float(ticker['lastPrice']),
+                    float(ticker['priceChange']),
+                    float(ticker['priceChangePercent']),
+                    float(ticker['quoteVolume']),
+                    now
+                )
+                
+                # Сохраняем текущую цену
+                current_prices[symbol] = price_data
+                
+                # Добавляем в историю
+                price_history[symbol].append({
+                    'timestamp': now_ts,
+                    'price': price_data.price,
+                    'volume': price_data.volume_24h
+                })
+            
+            updated_count = len(tickers)
+            if updated_count:
+                self._price_dicts_cache = None
+            logger.debug("Updated prices for %s symbols", updated_count)
+            
+            # Записываем успешный API вызов
+            await self.rate_limiter.record_api_call('binance', True, time.time())
+            
+            return updated_count > 0
                     
         except asyncio.TimeoutError:
             logger.warning("Timeout fetching prices from Binance")
             await self.rate_limiter.record_api_call('binance', False, time.time())
             return False
         except Exception as e:
-            logger.error(f"Error fetching prices: {e}")
+            logger.error("Error fetching prices: %s", e)
             await self.rate_limiter.record_api_call('binance', False, time.time())
             return False
     
+    async def _fetch_tickers(
+        self, url: str, symbols: Optional[List[str]] = None
+    ) -> Tuple[int, Optional[List[Dict[str, Any]]]]:
+        """24hr ticker по списку символов или по всему рынку: (HTTP статус, тикеры или None)."""
+        # Проверяем rate limit
+        rate_limit_result = await self.rate_limiter.acquire('binance')
+        if not rate_limit_result.allowed:
+            logger.debug("Rate limited, waiting %.2fs", rate_limit_result.wait_time)
+            await asyncio.sleep(rate_limit_result.wait_time)
+        
+        self._stats['api_calls'] += 1
+        
+        params = {'symbols': orjson.dumps(symbols).decode()} if symbols else None
+        async with self._session.get(url, params=params) as response:
+            if response.status == 200:
+                # orjson разбирает сотни тикеров заметно быстрее json из стандартной библиотеки
+                return response.status, orjson.loads(await response.read())
+            
+            return response.status, None
+    
+    async def _fetch_full_market(self, url: str, expected: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """24hr ticker всего рынка; отсутствующие в ответе символы из expected запоминаются как отклоненные."""
+        try:
+            status, data = await self._fetch_tickers(url)
+        except Exception as e:
+            logger.warning("Error fetching full ticker list: %s", e)
+            return None
+        
+        if data is None:
+            logger.warning("Binance API returned %s", status)
+            return None
+        
+        known = {ticker['symbol'] for ticker in data}
+        unknown = {symbol for symbol in expected if symbol not in known}
+        if unknown:
+            logger.warning("Symbols not listed on Binance, excluded from batches: %s", ", ".join(sorted(unknown)))
+            self._rejected_symbols.update(unknown)
+        
+        return data
+    
+    def _is_active(self) -> bool:
+        """Нужен ли частый опрос: есть активные пресеты или недавно смотрели цены."""
+        return self._has_active_presets or time.time() - self._last_activity < _ACTIVITY_WINDOW
+    
+    def _mark_activity(self) -> None:
+        """Отметка активности пользователей; из простоя мониторинг будится сразу."""
+        was_active = self._is_active()
+        self._last_activity = time.time()
+        if not was_active:
+            self._wakeup.set()
+    
+    async def _sleep_or_wakeup(self, timeout: float) -> None:
+        """Пауза между обновлениями, прерываемая _mark_activity."""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+    
     async def _check_all_alerts(self) -> None:
         """Проверка всех активных пресетов на алерты."""
         try:
-            # Получаем активные пресеты
-            active_presets = await self.repository.get_active_presets_cache()
+            # Активные пресеты по символу, пороги отсортированы
+            presets_by_symbol = await self.repository.get_active_presets_by_symbol()
+            self._has_active_presets = bool(presets_by_symbol)
             
-            for preset_id, preset_data in active_presets.items():
-                user_id = preset_data['user_id']
+            for symbol, (thresholds, presets) in presets_by_symbol.items():
+                price_data = self._current_prices.get(symbol)
+                if not price_data:
+                    continue
                 
-                for symbol in preset_data.get('symbols', []):
-                    price_data = self._current_prices.get(symbol)
-                    if not price_data:
-                        continue
-                    
-                    # Проверяем условие алерта
-                    change_percent = abs(price_data.change_percent_24h)
-                    if change_percent >= preset_data.get('percent_threshold', 0):
-                        await self._trigger_alert(user_id, preset_data, price_data)
+                # Срабатывают все пресеты с порогом не выше изменения - это префикс списка
+                change_percent = abs(price_data.change_percent_24h)
+                for preset_data in presets[:bisect_right(thresholds, change_percent)]:
+                    await self._trigger_alert(preset_data['user_id'], preset_data, price_data)
                         
         except Exception as e:
-            logger.error(f"Error checking alerts: {e}")
+            logger.error("Error checking alerts: %s", e)
     
     async def _trigger_alert(self, user_id: int, preset_data: Dict[str, Any], price_data: PriceData) -> None:
         """Срабатывание алерта."""
         try:
-            # Определяем направление
-            direction = "🟢" if price_data.change_percent_24h > 0 else "🔴"
-            
-            # Форматируем цену
-            if price_data.price >= 1:
-                price_str = f"{price_data.price:.2f}"
-            else:
-                price_str = f"{price_data.price:.8f}"
-            
-            change_icon = "🟢" if price_data.change_percent_24h > 0 else "🔴"
-            
-            message = (
-                f"{direction} <b>Price Alert!</b>\n\n"
-                
-                f"💰 <b>{price_data.symbol}</b>\n"
-                f"💵 Цена: <b>${price_str}</b>\n"
-                f"📊 Пресет: {preset_data.get('name', 'Unknown')}\n\n"
-                
-                f"📈 <b>Изменения за 24ч:</b>\n"
-                f"{change_icon} {price_data.change_percent_24h:+.2f}% (${price_data.change_24h:+.8f})\n"
-                f"📊 Объем: ${price_data.volume_24h:,.0f}\n\n"
-                
-                f"🕐 <b>Время:</b> {price_data.timestamp.strftime('%H:%M:%S')}"
-            )
+            head, tail = self._get_alert_text_parts(price_data)
+            message = f"{head}📊 Пресет: {preset_data.get('name', 'Unknown')}\n\n{tail}"
             
             await event_bus.publish(Event(
                 type=PRICE_ALERT_TRIGGERED,
-                data={
-                    "user_id": user_id,
-                    "message": message,
+                data=AlertPayload(user_id, message, {
                     "preset_id": preset_data.get('id'),
                     "symbol": price_data.symbol,
                     "current_price": price_data.price,
                     "change_percent": price_data.change_percent_24h
-                },
+                })._asdict(),
                 source_module="price_alerts"
             ))
             
             self._stats['alerts_triggered'] += 1
             
-            logger.info(f"Triggered price alert for user {user_id}: {price_data.symbol} ${price_data.price}")
+            logger.info("Triggered price alert for user %s: %s $%s", user_id, price_data.symbol, price_data.price)
             
         except Exception as e:
-            logger.error(f"Error triggering alert: {e}")
+            logger.error("Error triggering alert: %s", e)
+    
+    def _get_alert_text_parts(self, price_data: PriceData) -> Tuple[str, str]:
+        """Ценовая часть текста алерта: форматируется один раз на символ за обновление цен."""
+        cached = self._alert_text_cache.get(price_data.symbol)
+        if cached and cached[0] == price_data.timestamp:
+            return cached[1], cached[2]
+        
+        # Определяем направление
+        direction = "🟢" if price_data.change_percent_24h > 0 else "🔴"
+        
+        # Форматируем цену
+        if price_data.price >= 1:
+            price_str = f"{price_data.price:.2f}"
+        else:
+            price_str = f"{price_data.price:.8f}"
+        
+        change_icon = "🟢" if price_data.change_percent_24h > 0 else "🔴"
+        
+        head = (
+            f"{direction} <b>Price Alert!</b>\n\n"
+            
+            f"💰 <b>{price_data.symbol}</b>\n"
+            f"💵 Цена: <b>${price_str}</b>\n"
+        )
+        tail = (
+            f"📈 <b>Изменения за 24ч:</b>\n"
+            f"{change_icon} {price_data.change_percent_24h:+.2f}% (${price_data.change_24h:+.8f})\n"
+            f"📊 Объем: ${price_data.volume_24h:,.0f}\n\n"
+            
+            f"🕐 <b>Время:</b> {price_data.timestamp.strftime('%H:%M:%S')}"
+        )
+        
+        self._alert_text_cache[price_data.symbol] = (price_data.timestamp, head, tail)
+        return head, tail
     
     async def _cleanup_old_data(self) -> None:
         """Фоновая очистка старых данных."""
@@ -401,27 +535,25 @@ class PriceAlertsService:
                 current_time = time.time()
                 cutoff_time = current_time - 86400  # 24 часа
                 
-                for symbol, history in self._price_history.items():
+                for history in self._price_history.values():
                     while history and history[0].get('timestamp', 0) < cutoff_time:
                         history.popleft()
                 
+                # Раз в час даем отклоненным символам второй шанс - их могли залистить
+                self._rejected_symbols.clear()
+                
                 logger.debug("Cleaned up old price history data")
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in cleanup: {e}")
+                logger.error("Error in cleanup: %s", e)
     
     # PUBLIC API METHODS
     
-    def get_user_presets(self, user_id: int) -> List[Dict[str, Any]]:
-        """Получение пресетов пользователя."""
-        # Используем асинхронную обертку для синхронного вызова
-        import asyncio
-        try:
-            return asyncio.create_task(self.repository.get_user_presets(user_id)).result()
-        except:
-            return []
+    async def get_user_presets(self, user_id: int) -> List[Dict[str, Any]]:
+        """Получение пресетов пользователя (чтение из БД - не блокируем event loop)."""
+        return await self.repository.get_user_presets(user_id)
     
     def get_user_alerts(self, user_id: int) -> List[Dict[str, Any]]:
         """Получение алертов пользователя."""
@@ -445,18 +577,23 @@ class PriceAlertsService:
     
     def get_current_prices(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
         """Получение текущих цен."""
-        if symbols:
-            symbols = [s.upper() for s in symbols]
-            return {
+        # Цены меняются раз в update_interval - сериализуем один раз на обновление, а не на запрос
+        if self._price_dicts_cache is None:
+            self._price_dicts_cache = {
                 symbol: price_data.to_dict()
                 for symbol, price_data in self._current_prices.items()
-                if symbol in symbols
             }
-        else:
+        price_dicts = self._price_dicts_cache
+        
+        # Вызывающим - копии: изменение результата не должно портить общий кеш
+        if symbols:
             return {
-                symbol: price_data.to_dict()
-                for symbol, price_data in self._current_prices.items()
+                symbol: dict(price_dicts[symbol])
+                for symbol in (s.upper() for s in symbols)
+                if symbol in price_dicts
             }
+        else:
+            return {symbol: dict(price_dict) for symbol, price_dict in price_dicts.items()}
     
     def get_popular_symbols(self) -> List[str]:
         """Получение популярных символов."""
@@ -510,7 +647,12 @@ class PriceAlertsService:
         user_id = event.data.get("user_id")
         preset_data = event.data.get("preset_data")
         
+        # Символы приводятся к каноничному виду Binance один раз на входе - дальше поиск без .upper()
+        if preset_data.get("symbols"):
+            preset_data["symbols"] = [symbol.upper() for symbol in preset_data["symbols"]]
+        
         preset_id = await self.repository.create_preset(user_id, preset_data)
+        self._mark_activity()
         
         # Добавляем символы в мониторинг
         if preset_id and preset_data.get("symbols"):
@@ -549,6 +691,7 @@ class PriceAlertsService:
         preset_id = event.data.get("preset_id")
         
         success = await self.repository.update_preset_status(user_id, preset_id, True)
+        self._mark_activity()
         
         await event_bus.publish(Event(
             type="price_alerts.preset_activated",
@@ -581,6 +724,7 @@ class PriceAlertsService:
         """Обработка запроса текущих цен."""
         symbols = event.data.get("symbols")
         prices = self.get_current_prices(symbols)
+        self._mark_activity()
         
         await event_bus.publish(Event(
             type="price_alerts.current_prices_response",
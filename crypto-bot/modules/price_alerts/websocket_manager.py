@@ -223,7 +223,7 @@ class WebSocketManager:
         stats = self._stats.copy()
         stats.update({
             'running': self._running,
-            'active_connections': len([t for t in self._connection_tasks if not t.done()]),
+            'active_connections': sum(1 for t in self._connection_tasks if not t.done()),
             'total_streams': len(self._current_streams),
             'session_active': self._session is not None
         })
@@ -12,4 +12,12 @@ __all__ = [
     'PriceAlertsHandler',
     'MainKeyboards',
     'LoggingMiddleware'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    """Ленивый импорт тяжелых handlers - только при первом обращении."""
+    if name == 'PriceAlertsHandler':
+        from .handlers.price_alerts_handler import PriceAlertsHandler
+        return PriceAlertsHandler
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -3,10 +3,9 @@
 
 import asyncio
 import time
-from typing import Dict, Any, Set, List
+from typing import Dict, Any, List, Tuple
 from collections import defaultdict, deque
 
-from shared.events import event_bus, Event
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,7 +29,7 @@ class AlertDispatcher:
         )
         
         # Cooldown для предотвращения дублирования
-        self._cooldowns: Dict[str, float] = {}
+        self._cooldowns: Dict[Tuple[int, str, int], float] = {}
         self._cooldown_time = 60
         
         # Конфигурация
@@ -78,7 +77,7 @@ class AlertDispatcher:
             return
         
         # Создаем ключ для cooldown
-        cooldown_key = f"{user_id}_{alert_type}_{hash(message[:50])}"
+        cooldown_key = (user_id, alert_type, hash(message[:50]))
         
         # Проверяем cooldown
         if self._is_in_cooldown(cooldown_key):
@@ -98,22 +97,19 @@ class AlertDispatcher:
             self._stats['rate_limited'] += 1
             return
         
-        try:
-            # Добавляем в очередь пользователя
-            await self._user_queues[user_id].put({
-                'message': message,
-                'alert_type': alert_type,
-                'timestamp': time.time()
-            })
-            
-            # Создаем задачу обработки для пользователя если её нет
-            if user_id not in self._user_tasks or self._user_tasks[user_id].done():
-                self._user_tasks[user_id] = asyncio.create_task(
-                    self._process_user_queue(user_id)
-                )
-            
-        except asyncio.QueueFull:
-            logger.warning(f"Queue full for user {user_id}")
+        queue = self._user_queues[user_id]
+        
+        # Буфер пользователя ограничен: при переполнении вытесняем самый старый алерт
+        if queue.full():
+            queue.get_nowait()
+            logger.warning("Queue full for user %s, oldest alert dropped", user_id)
+        queue.put_nowait(message)
+        
+        # Создаем задачу обработки для пользователя если её нет
+        if user_id not in self._user_tasks or self._user_tasks[user_id].done():
+            self._user_tasks[user_id] = asyncio.create_task(
+                self._process_user_queue(user_id)
+            )
     
     async def _process_user_queue(self, user_id: int):
         """Обработка очереди алертов для пользователя."""
@@ -135,13 +131,13 @@ class AlertDispatcher:
                 await asyncio.sleep(self.batch_timeout)
                 
             except asyncio.CancelledError:
-                logger.debug(f"User queue processor {user_id} cancelled")
+                logger.debug("User queue processor %s cancelled", user_id)
                 break
             except Exception as e:
-                logger.error(f"Error processing user {user_id} queue: {e}")
+                logger.error("Error processing user %s queue: %s", user_id, e)
                 await asyncio.sleep(5)
     
-    async def _collect_user_batch(self, queue: asyncio.Queue) -> List[Dict[str, Any]]:
+    async def _collect_user_batch(self, queue: asyncio.Queue) -> List[str]:
         """Сбор батча алертов для пользователя."""
         batch = []
         start_time = time.time()
@@ -165,7 +161,7 @@ class AlertDispatcher:
         
         return batch
     
-    async def _send_user_batch(self, user_id: int, batch: List[Dict[str, Any]]):
+    async def _send_user_batch(self, user_id: int, batch: List[str]):
         """Отправка батча алертов пользователю."""
         if not batch:
             return
@@ -173,24 +169,19 @@ class AlertDispatcher:
         try:
             if len(batch) == 1:
                 # Одиночный алерт
-                message = batch[0]['message']
+                message = batch[0]
             else:
-                # Группируем множественные алерты
-                messages = [alert['message'] for alert in batch]
-                message = f"🚨 Групповой алерт ({len(batch)}):\n" + "\n".join(messages)
+                # Группируем множественные алерты (префикс типа уже в тексте)
+                message = f"🚨 Групповой алерт ({len(batch)}):\n" + "\n".join(batch)
             
-            # Ограничиваем длину сообщения
-            if len(message) > 4000:
-                message = message[:4000] + "\n... (обрезано)"
-            
-            # Отправляем через telegram service
-            await self.telegram_service.send_message(user_id, message, parse_mode="HTML")
+            # Длинный батч telegram service разобьет на несколько сообщений
+            await self.telegram_service.send_message(user_id, message)
             
             self._stats['total_dispatched'] += len(batch)
-            logger.debug(f"Sent {len(batch)} alerts to user {user_id}")
+            logger.debug("Sent %s alerts to user %s", len(batch), user_id)
             
         except Exception as e:
-            logger.error(f"Error sending alerts to user {user_id}: {e}")
+            logger.error("Error sending alerts to user %s: %s", user_id, e)
     
     def _check_user_rate_limit(self, user_id: int) -> bool:
         """Проверка rate limit для пользователя."""
@@ -209,7 +200,7 @@ class AlertDispatcher:
         user_history.append(current_time)
         return True
     
-    def _is_in_cooldown(self, key: str) -> bool:
+    def _is_in_cooldown(self, key: Tuple[int, str, int]) -> bool:
         """Проверка cooldown."""
         cooldown_until = self._cooldowns.get(key, 0)
         return time.time() < cooldown_until
@@ -239,7 +230,7 @@ class AlertDispatcher:
         if user_id in self._user_limits:
             del self._user_limits[user_id]
         
-        logger.debug(f"Cleaned up queue for user {user_id}")
+        logger.debug("Cleaned up queue for user %s", user_id)
     
     async def _cleanup_cooldowns(self):
         """Периодическая очистка старых cooldown'ов."""
@@ -257,12 +248,38 @@ class AlertDispatcher:
                     del self._cooldowns[key]
                 
                 if expired_keys:
-                    logger.debug(f"Cleaned up {len(expired_keys)} expired cooldowns")
+                    logger.debug("Cleaned up %s expired cooldowns", len(expired_keys))
                     
+                self._cleanup_idle_users(current_time)
+                
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"Error in cooldown cleanup: {e}")
+                logger.error("Error in cooldown cleanup: %s", e)
+    
+    def _cleanup_idle_users(self, current_time: float):
+        """Удаление очередей и истории rate limit пользователей без активности."""
+        # defaultdict заводит запись на каждого получателя - без чистки они копятся вечно
+        idle_users = [
+            user_id for user_id, queue in self._user_queues.items()
+            if queue.empty() and (
+                user_id not in self._user_tasks or self._user_tasks[user_id].done()
+            )
+        ]
+        for user_id in idle_users:
+            del self._user_queues[user_id]
+            self._user_tasks.pop(user_id, None)
+        
+        # История старше минуты для rate limit уже не нужна
+        stale_limits = [
+            user_id for user_id, history in self._user_limits.items()
+            if not history or current_time - history[-1] > 60
+        ]
+        for user_id in stale_limits:
+            del self._user_limits[user_id]
+        
+        if idle_users or stale_limits:
+            logger.debug("Cleaned up %s idle queues, %s rate limit histories", len(idle_users), len(stale_limits))
     
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики."""
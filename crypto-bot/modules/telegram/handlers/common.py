@@ -0,0 +1,94 @@
+# modules/telegram/handlers/common.py
+"""Общие помощники handlers: статические экраны и редактирование сообщений."""
+
+import asyncio
+import re
+from typing import List, NamedTuple, Optional
+
+from aiogram import types
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import InlineKeyboardMarkup, MessageEntity
+
+
+class Screen(NamedTuple):
+    """Статический экран: текст без разметки и заранее рассчитанные entities."""
+    text: str
+    entities: List[MessageEntity]
+
+
+_BOLD_TAG_RE = re.compile(r"(</?b>)")
+_EXTRA_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+
+def prerender(html: str) -> Screen:
+    """Перевод текста с <b> в plain text + entities (смещения в UTF-16, как требует Telegram)."""
+    # Лишние пустые строки и хвостовые пробелы Telegram все равно не покажет - убираем один раз
+    html = _EXTRA_BLANK_LINES_RE.sub("\n\n", html.strip())
+    
+    parts = []
+    entities = []
+    offset = 0
+    bold_start = None
+    
+    for chunk in _BOLD_TAG_RE.split(html):
+        if chunk == "<b>":
+            bold_start = offset
+        elif chunk == "</b>":
+            entities.append(MessageEntity(type="bold", offset=bold_start, length=offset - bold_start))
+            bold_start = None
+        elif chunk:
+            parts.append(chunk)
+            offset += len(chunk.encode("utf-16-le")) // 2
+    
+    return Screen("".join(parts), entities)
+
+
+async def edit_text(message: types.Message, text: str, reply_markup: InlineKeyboardMarkup) -> None:
+    """Редактирование сообщения без лишнего запроса, если содержимое не изменилось."""
+    # Telegram обрезает хвостовые переводы строк - без них и сравнение с текущим текстом честное
+    text = text.rstrip()
+    same_text = message.html_text == text
+    if same_text and message.reply_markup == reply_markup:
+        return
+    
+    try:
+        if same_text:
+            # Изменилась только клавиатура - текст заново не отправляем
+            await message.edit_reply_markup(reply_markup=reply_markup)
+        else:
+            await message.edit_text(text, reply_markup=reply_markup)
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+
+async def edit_screen(message: types.Message, screen: Screen, reply_markup: InlineKeyboardMarkup) -> None:
+    """Редактирование сообщения статическим экраном: entities вместо parse_mode."""
+    same_text = message.text == screen.text and (message.entities or []) == screen.entities
+    if same_text and message.reply_markup == reply_markup:
+        return
+    
+    try:
+        if same_text:
+            await message.edit_reply_markup(reply_markup=reply_markup)
+        else:
+            await message.edit_text(
+                screen.text, entities=screen.entities, reply_markup=reply_markup, parse_mode=None
+            )
+    except TelegramBadRequest as e:
+        if "message is not modified" not in str(e):
+            raise
+
+
+async def edit_and_answer(
+    callback: types.CallbackQuery, text: str, reply_markup: InlineKeyboardMarkup, notice: Optional[str] = None
+) -> None:
+    """Редактирование сообщения и ответ на callback параллельно - два запроса к API перекрываются."""
+    await asyncio.gather(edit_text(callback.message, text, reply_markup), callback.answer(notice))
+
+
+async def screen_and_answer(
+    callback: types.CallbackQuery, screen: Screen, reply_markup: InlineKeyboardMarkup, notice: Optional[str] = None
+) -> None:
+    """Статический экран и ответ на callback параллельно."""
+    await asyncio.gather(edit_screen(callback.message, screen, reply_markup), callback.answer(notice))
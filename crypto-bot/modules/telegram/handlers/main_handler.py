@@ -2,28 +2,292 @@
 """Обновленный главный обработчик без старых сервисов и кеша."""
 
 from datetime import datetime
+from itertools import islice
 from typing import Any, Dict, Optional
 from aiogram import Router, types, F
 from aiogram.filters import Command
-from aiogram.fsm.context import FSMContext
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from modules.telegram.keyboards.main_keyboards import MainKeyboards
 from shared.events import event_bus, Event, USER_COMMAND_RECEIVED
+from .common import edit_and_answer, prerender, screen_and_answer
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Форматы времени на экранах
+_TIME_FMT = '%H:%M:%S'
+_DATETIME_FMT = '%d.%m.%Y %H:%M'
+_DATE_FMT = '%d.%m.%Y'
+
+# Статусы сервисов (общие экземпляры, только для чтения)
+_STATUS_RUNNING = {"running": True, "status": "Активен"}
+_STATUS_STOPPED = {"running": False, "status": "Остановлен"}
+_STATUS_READY = {"running": True, "status": "Готов"}
+_STATUS_UNINIT = {"running": False, "status": "Не инициализирован"}
+
+
+# Статические клавиатуры экранов (собираются один раз при импорте)
+_STATUS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🔄 Обновить", callback_data="cmd_status"),
+        InlineKeyboardButton(text="📊 Детали", callback_data="status_details"),
+    ],
+    [InlineKeyboardButton(text="🏠 Главное меню", callback_data="main_menu")],
+])
+
+_PRICE_ALERTS_INFO_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📋 Перейти к Price Alerts", callback_data="price_alerts")],
+    [InlineKeyboardButton(text="📊 Текущие цены", callback_data="price_current_prices")],
+    [InlineKeyboardButton(text="📈 Подробная статистика", callback_data="price_statistics")],
+    [InlineKeyboardButton(text="ℹ️ Справка", callback_data="price_help_info")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_COMING_SOON_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📈 Попробовать Price Alerts", callback_data="price_alerts")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_SETTINGS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📊 Моя статистика", callback_data="settings_stats")],
+    [InlineKeyboardButton(text="🔧 Техническая информация", callback_data="about_tech")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_ABOUT_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="📝 Changelog", callback_data="about_changelog"),
+        InlineKeyboardButton(text="🔧 Техническая информация", callback_data="about_tech"),
+    ],
+    [InlineKeyboardButton(text="📊 Статистика системы", callback_data="cmd_status")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_USER_STATS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔄 Обновить", callback_data="settings_stats")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="settings")],
+])
+
+_CHANGELOG_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔮 Планы", callback_data="about_roadmap")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="about")],
+])
+
+_TECH_INFO_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📊 Подробная статистика", callback_data="cmd_status")],
+    [InlineKeyboardButton(text="📝 Changelog", callback_data="about_changelog")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="about")],
+])
+
+_DETAILED_STATUS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔄 Обновить", callback_data="status_details")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="cmd_status")],
+])
+
+_ROADMAP_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📈 Попробовать Price Alerts", callback_data="price_alerts")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="about")],
+])
+
+_PRICE_HELP_INFO_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📈 Перейти к Price Alerts", callback_data="price_alerts")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+# Статические тексты экранов
+_GAS_TRACKER_TEXT = (
+    "⛽ <b>Gas Tracker</b>\n"
+    "<i>Модуль в разработке</i>\n\n"
+    
+    "🚧 <b>Планируемый функционал:</b>\n"
+    "• Мониторинг цен газа Ethereum\n"
+    "• Уведомления при достижении порогов\n"
+    "• Исторические данные\n"
+    "• Рекомендации по оптимальному времени\n\n"
+    
+    "📅 <b>Статус:</b> В разработке\n"
+    "🕐 <b>Планируемый релиз:</b> Скоро"
+)
+
+_WHALE_TRACKER_TEXT = (
+    "🐋 <b>Whale Tracker</b>\n"
+    "<i>Модуль в разработке</i>\n\n"
+    
+    "🚧 <b>Планируемый функционал:</b>\n"
+    "• Отслеживание крупных транзакций\n"
+    "• Анализ движений китов\n"
+    "• Уведомления о значительных переводах\n"
+    "• Статистика по кошелькам\n\n"
+    
+    "📅 <b>Статус:</b> В разработке\n"
+    "🕐 <b>Планируемый релиз:</b> Скоро"
+)
+
+_WALLET_TRACKER_TEXT = (
+    "👛 <b>Wallet Tracker</b>\n"
+    "<i>Модуль в разработке</i>\n\n"
+    
+    "🚧 <b>Планируемый функционал:</b>\n"
+    "• Мониторинг кошельков\n"
+    "• Уведомления о транзакциях\n"
+    "• Отслеживание балансов\n"
+    "• Анализ активности\n\n"
+    
+    "📅 <b>Статус:</b> В разработке\n"
+    "🕐 <b>Планируемый релиз:</b> Скоро"
+)
+
+_SETTINGS_TEXT = (
+    "⚙️ <b>Настройки</b>\n\n"
+    
+    "🔧 <b>Системные настройки:</b>\n"
+    "• Архитектура: Модульная v2.0\n"
+    "• Кеширование: Встроенное\n"
+    "• События: Упрощенная система\n\n"
+    
+    "📈 <b>Price Alerts:</b>\n"
+    "• Статус: Активен\n"
+    "• Кеш: Встроен в репозиторий\n"
+    "• API: Binance (бесплатный)\n\n"
+    
+    "🎛️ Управление:"
+)
+
+_CHANGELOG_TEXT = (
+    "📝 <b>История изменений</b>\n\n"
+    
+    "<b>🚀 Версия 2.0.0</b> (Декабрь 2024)\n"
+    "• Полная реструктуризация проекта\n"
+    "• Модульная архитектура\n"
+    "• Кеш встроен в репозитории\n"
+    "• Упрощена система событий\n"
+    "• Убрана избыточность кода\n"
+    "• Улучшена производительность\n"
+    "• Alert dispatcher встроен в Telegram\n"
+    "• Token manager выделен в отдельный модуль\n\n"
+    
+    "<b>📈 Архитектурные изменения:</b>\n"
+    "• config/ - модульные настройки\n"
+    "• core/ - только общие компоненты\n"
+    "• shared/ - минимальный набор утилит\n"
+    "• modules/ - самодостаточные модули\n\n"
+    
+    "<b>🔧 Технические улучшения:</b>\n"
+    "• PriceAlertsRepository с встроенным кешем\n"
+    "• Упрощенный EventBus без circuit breaker\n"
+    "• Все handlers в telegram модуле\n"
+    "• Изоляция модулей\n\n"
+    
+    "<b>📋 Сохранена функциональность:</b>\n"
+    "• Price Alerts работает полностью\n"
+    "• Все кнопки и команды функциональны\n"
+    "• Telegram интерфейс не изменился\n"
+    "• API интеграции сохранены"
+)
+
+_ROADMAP_TEXT = (
+    "🔮 <b>Планы развития</b>\n\n"
+    
+    "<b>📅 Ближайшие планы:</b>\n"
+    "• Завершение Gas Tracker модуля\n"
+    "• Добавление Whale Tracker функционала\n"
+    "• Реализация Wallet Tracker\n"
+    "• Интеграция с premium API\n\n"
+    
+    "<b>🚀 Среднесрочные цели:</b>\n"
+    "• Расширенная аналитика\n"
+    "• Дополнительные биржи\n"
+    "• Мобильные уведомления\n"
+    "• Экспорт данных\n\n"
+    
+    "<b>💡 Долгосрочное видение:</b>\n"
+    "• Мультиплатформенность\n"
+    "• Машинное обучение для прогнозов\n"
+    "• Социальные функции\n"
+    "• API для разработчиков\n\n"
+    
+    "🎯 Архитектура v2.0 подготовлена для всех этих улучшений!"
+)
+
+_PRICE_HELP_TEXT = (
+    "ℹ️ <b>Справка по Price Alerts</b>\n\n"
+    
+    "📝 <b>Как создать пресет:</b>\n"
+    "1. Нажмите 'Перейти к Price Alerts'\n"
+    "2. Выберите 'Создать пресет'\n"
+    "3. Следуйте шагам мастера\n\n"
+    
+    "🎯 <b>Советы по настройке:</b>\n"
+    "• Процент 1-2% - много сигналов\n"
+    "• Процент 3-5% - оптимально\n"
+    "• Процент 10%+ - только крупные движения\n\n"
+    
+    "⏰ <b>Таймфреймы:</b>\n"
+    "• 1m/5m - для скальпинга\n"
+    "• 15m/1h - для обычной торговли\n"
+    "• 4h/1d - для долгосрочных позиций\n\n"
+    
+    "🔔 Уведомления приходят мгновенно при достижении условий!"
+)
+
+# Экраны только с <b> разбираются один раз при импорте
+_SETTINGS_SCREEN = prerender(_SETTINGS_TEXT)
+_CHANGELOG_SCREEN = prerender(_CHANGELOG_TEXT)
+_ROADMAP_SCREEN = prerender(_ROADMAP_TEXT)
+_PRICE_HELP_SCREEN = prerender(_PRICE_HELP_TEXT)
+
+
+def _service_status(service) -> Dict[str, Any]:
+    """Статус сервиса по его флагу running."""
+    if service is None:
+        return _STATUS_UNINIT
+    
+    running = getattr(service, 'running', None)
+    if running is None:
+        return _STATUS_READY
+    
+    return _STATUS_RUNNING if running else _STATUS_STOPPED
+
 
 class MainHandler:
     """Главный обработчик команд бота с обновленной функциональностью."""
     
+    __slots__ = ("router", "keyboards", "price_alerts_service", "_callback_routes")
+    
     def __init__(self):
         self.router = Router()
         self.keyboards = MainKeyboards()
         
         # Сервисы (будут инжектированы)
         self.price_alerts_service = None
+        
+        # Callback'и меню: callback_data -> обработчик
+        self._callback_routes = {
+            # Главное меню
+            "main_menu": self.show_main_menu,
+            
+            # Модули
+            "price_alerts": self.show_price_alerts_menu,
+            "gas_tracker": self.show_gas_tracker_menu,
+            "whale_tracker": self.show_whale_tracker_menu,
+            "wallet_tracker": self.show_wallet_tracker_menu,
+            
+            # Настройки и информация
+            "settings": self.show_settings,
+            "about": self.show_about,
+            "cmd_status": self.cmd_status_callback,
+            
+            # Вложенные меню настроек и информации
+            "settings_notifications": self.toggle_notifications,
+            "settings_stats": self.show_user_stats,
+            "about_changelog": self.show_changelog,
+            "about_tech": self.show_tech_info,
+            "about_roadmap": self.about_roadmap,
+            
+            # Price Alerts info
+            "price_help_info": self.price_help_info,
+        }
     
     def set_services(self, **services):
         """Инъекция сервисов."""
@@ -36,46 +300,23 @@ class MainHandler:
         self.router.message(Command("help"))(self.cmd_help)
         self.router.message(Command("status"))(self.cmd_status)
         
-        # Главное меню
-        self.router.callback_query(F.data == "main_menu")(self.show_main_menu)
-        
-        # Модули
-        self.router.callback_query(F.data == "price_alerts")(self.show_price_alerts_menu)
-        self.router.callback_query(F.data == "gas_tracker")(self.show_gas_tracker_menu)
-        self.router.callback_query(F.data == "whale_tracker")(self.show_whale_tracker_menu)
-        self.router.callback_query(F.data == "wallet_tracker")(self.show_wallet_tracker_menu)
-        
-        # Настройки и информация
-        self.router.callback_query(F.data == "settings")(self.show_settings)
-        self.router.callback_query(F.data == "about")(self.show_about)
-        self.router.callback_query(F.data == "cmd_status")(self.cmd_status_callback)
-        
-        # Дополнительные обработчики для вложенных меню
-        self._register_additional_handlers()
-        
-        dp.include_router(self.router)
-    
-    def _register_additional_handlers(self):
-        """Регистрация дополнительных обработчиков."""
-        # Settings handlers
-        self.router.callback_query(F.data == "settings_notifications")(self.toggle_notifications)
-        self.router.callback_query(F.data == "settings_stats")(self.show_user_stats)
-        
-        # About handlers
-        self.router.callback_query(F.data == "about_changelog")(self.show_changelog)
-        self.router.callback_query(F.data == "about_tech")(self.show_tech_info)
-        self.router.callback_query(F.data == "about_roadmap")(self.about_roadmap)
+        # Меню - один фильтр на все пункты, обработчик выбирается по таблице
+        self.router.callback_query(F.data.in_(self._callback_routes.keys()))(self._dispatch_callback)
         
         # Status handlers
         self.router.callback_query(F.data.startswith("status_"))(self.handle_status_actions)
         
-        # Price Alerts info
-        self.router.callback_query(F.data == "price_help_info")(self.price_help_info)
+        dp.include_router(self.router)
+    
+    async def _dispatch_callback(self, callback: types.CallbackQuery):
+        """Диспетчеризация callback'ов меню по таблице."""
+        await self._callback_routes[callback.data](callback)
     
     async def cmd_start(self, message: types.Message):
         """Команда /start с обновленной функциональностью."""
         user_id = message.from_user.id
         username = message.from_user.username
+        first_name = message.from_user.first_name
         
         # Публикуем событие
         await event_bus.publish(Event(
@@ -84,74 +325,72 @@ class MainHandler:
                 "user_id": user_id,
                 "command": "start",
                 "username": username,
-                "first_name": message.from_user.first_name
+                "first_name": first_name
             },
             source_module="telegram"
         ))
         
-        welcome_text = (
-            f"🤖 <b>Добро пожаловать{', ' + message.from_user.first_name if message.from_user.first_name else ''}!</b>\n\n"
-            
-            "🚀 <b>Crypto Monitor Bot v2.0</b>\n"
-            "Профессиональный мониторинг криптовалют\n\n"
-            
-            "📊 <b>Доступные модули:</b>\n"
-            "📈 <b>Price Alerts</b> - Умные ценовые уведомления\n"
-            "⛽ <b>Gas Tracker</b> - В разработке\n"
-            "🐋 <b>Whale Tracker</b> - В разработке\n"
-            "👛 <b>Wallet Tracker</b> - В разработке\n\n"
-            
-            "✨ <b>Новая архитектура v2.0:</b>\n"
-            "• Модульная система\n"
-            "• Улучшенная производительность\n"
-            "• Встроенное кеширование\n\n"
-            
-            "⚡ Выберите модуль для начала работы:"
-        )
+        name_part = f", {first_name}" if first_name else ""
+        
+        welcome_text = f"""🤖 <b>Добро пожаловать{name_part}!</b>
+
+🚀 <b>Crypto Monitor Bot v2.0</b>
+Профессиональный мониторинг криптовалют
+
+📊 <b>Доступные модули:</b>
+📈 <b>Price Alerts</b> - Умные ценовые уведомления
+⛽ <b>Gas Tracker</b> - В разработке
+🐋 <b>Whale Tracker</b> - В разработке
+👛 <b>Wallet Tracker</b> - В разработке
+
+✨ <b>Новая архитектура v2.0:</b>
+• Модульная система
+• Улучшенная производительность
+• Встроенное кеширование
+
+⚡ Выберите модуль для начала работы:"""
         
         keyboard = self.keyboards.get_main_menu_keyboard()
-        await message.answer(welcome_text, reply_markup=keyboard, parse_mode="HTML")
+        await message.answer(welcome_text, reply_markup=keyboard)
     
     async def cmd_help(self, message: types.Message):
         """Команда /help с обновленной информацией."""
-        help_text = (
-            "📖 <b>Справка по Crypto Monitor Bot v2.0</b>\n\n"
-            
-            "<b>🎯 Основные команды:</b>\n"
-            "/start - Главное меню и приветствие\n"
-            "/help - Подробная справка (эта страница)\n"
-            "/status - Статус системы\n\n"
-            
-            "<b>📈 Price Alerts - Ценовые уведомления:</b>\n"
-            "• Создание пользовательских пресетов\n"
-            "• Отслеживание множества пар одновременно\n"
-            "• Настройка процента изменения\n"
-            "• Различные таймфреймы\n"
-            "• Группировка уведомлений\n"
-            "• Встроенное кеширование для быстрой работы\n\n"
-            
-            "<b>🔧 Другие модули:</b>\n"
-            "⛽ Gas Tracker - В разработке\n"
-            "🐋 Whale Tracker - В разработке\n"
-            "👛 Wallet Tracker - В разработке\n\n"
-            
-            "<b>⚙️ Дополнительные возможности:</b>\n"
-            "• Персональные настройки\n"
-            "• Статистика использования\n"
-            "• Техническая информация\n\n"
-            
-            "<b>🔧 Архитектурные улучшения v2.0:</b>\n"
-            "• Модульная система\n"
-            "• Встроенное кеширование\n"
-            "• Улучшенная отказоустойчивость\n"
-            "• Упрощенная структура проекта\n\n"
-            
-            "❓ <b>Нужна помощь?</b>\n"
-            "Используйте кнопки меню для навигации"
-        )
+        help_text = """📖 <b>Справка по Crypto Monitor Bot v2.0</b>
+
+<b>🎯 Основные команды:</b>
+/start - Главное меню и приветствие
+/help - Подробная справка (эта страница)
+/status - Статус системы
+
+<b>📈 Price Alerts - Ценовые уведомления:</b>
+• Создание пользовательских пресетов
+• Отслеживание множества пар одновременно
+• Настройка процента изменения
+• Различные таймфреймы
+• Группировка уведомлений
+• Встроенное кеширование для быстрой работы
+
+<b>🔧 Другие модули:</b>
+⛽ Gas Tracker - В разработке
+🐋 Whale Tracker - В разработке
+👛 Wallet Tracker - В разработке
+
+<b>⚙️ Дополнительные возможности:</b>
+• Персональные настройки
+• Статистика использования
+• Техническая информация
+
+<b>🔧 Архитектурные улучшения v2.0:</b>
+• Модульная система
+• Встроенное кеширование
+• Улучшенная отказоустойчивость
+• Упрощенная структура проекта
+
+❓ <b>Нужна помощь?</b>
+Используйте кнопки меню для навигации"""
         
         keyboard = self.keyboards.get_help_keyboard()
-        await message.answer(help_text, reply_markup=keyboard, parse_mode="HTML")
+        await message.answer(help_text, reply_markup=keyboard)
     
     async def cmd_status(self, message: types.Message):
         """Команда /status с реальной информацией о модулях."""
@@ -166,15 +405,15 @@ class MainHandler:
         # Получаем статус EventBus
         event_stats = event_bus.get_stats()
         
-        status_text = (
+        parts = [
             "📊 <b>Статус системы Crypto Monitor Bot v2.0</b>\n\n"
             
             "<b>🔧 Основные модули:</b>\n"
-        )
+        ]
         
         # Проверяем статус модулей
         modules_status = {
-            "📈 Price Alerts": self._check_service_status(self.price_alerts_service),
+            "📈 Price Alerts": _service_status(self.price_alerts_service),
             "⛽ Gas Tracker": {"running": False, "status": "В разработке"},
             "🐋 Whale Tracker": {"running": False, "status": "В разработке"},
             "👛 Wallet Tracker": {"running": False, "status": "В разработке"}
@@ -182,9 +421,9 @@ class MainHandler:
         
         for module_name, status in modules_status.items():
             status_icon = "🟢" if status["running"] else "🔴"
-            status_text += f"{status_icon} {module_name}: {status['status']}\n"
+            parts.append(f"{status_icon} {module_name}: {status['status']}\n")
         
-        status_text += (
+        parts.append(
             f"\n<b>📡 Event System:</b>\n"
             f"• Типов событий: {event_stats.get('event_types', 0)}\n"
             f"• Активных обработчиков: {event_stats.get('total_handlers', 0)}\n"
@@ -194,7 +433,7 @@ class MainHandler:
         # Добавляем статистику Price Alerts если доступен
         if self.price_alerts_service:
             pa_stats = self.price_alerts_service.get_statistics()
-            status_text += (
+            parts.append(
                 f"\n<b>📈 Price Alerts:</b>\n"
                 f"• Отслеживаемых символов: {pa_stats.get('monitored_symbols', 0)}\n"
                 f"• Цен в кеше: {pa_stats.get('current_prices_count', 0)}\n"
@@ -203,37 +442,18 @@ class MainHandler:
             
             repo_stats = pa_stats.get('repository_stats', {})
             if repo_stats:
-                status_text += (
+                parts.append(
                     f"• Кешированных пользователей: {repo_stats.get('cached_users', 0)}\n"
                     f"• Активных пресетов: {repo_stats.get('active_presets', 0)}\n"
                 )
         
-        status_text += f"\n🕐 <b>Последнее обновление:</b> {datetime.now().strftime('%H:%M:%S')}"
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="cmd_status")
-        builder.button(text="📊 Детали", callback_data="status_details")
-        builder.button(text="🏠 Главное меню", callback_data="main_menu")
-        builder.adjust(2, 1)
+        parts.append(f"\n🕐 <b>Последнее обновление:</b> {datetime.now().strftime(_TIME_FMT)}")
+        status_text = "".join(parts)
         
         if callback:
-            await callback.message.edit_text(status_text, reply_markup=builder.as_markup(), parse_mode="HTML")
-            await callback.answer("🔄 Статус обновлен")
+            await edit_and_answer(callback, status_text, _STATUS_KB, "🔄 Статус обновлен")
         else:
-            await message.answer(status_text, reply_markup=builder.as_markup(), parse_mode="HTML")
-    
-    def _check_service_status(self, service) -> Dict[str, Any]:
-        """Проверка статуса сервиса."""
-        if service is None:
-            return {"running": False, "status": "Не инициализирован"}
-        
-        if hasattr(service, 'running'):
-            if service.running:
-                return {"running": True, "status": "Активен"}
-            else:
-                return {"running": False, "status": "Остановлен"}
-        
-        return {"running": True, "status": "Готов"}
+            await message.answer(status_text, reply_markup=_STATUS_KB)
     
     async def show_main_menu(self, callback: types.CallbackQuery):
         """Показ главного меню."""
@@ -249,13 +469,12 @@ class MainHandler:
                     f"• Алертов отправлено: {stats.get('alerts_triggered', 0)}\n\n"
                 )
             except Exception as e:
-                logger.error(f"Error getting PA stats: {e}")
+                logger.error("Error getting PA stats: %s", e)
         
         text += "🎯 Выберите модуль для работы:"
         
         keyboard = self.keyboards.get_main_menu_keyboard()
-        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, keyboard)
     
     # ОБРАБОТЧИКИ МОДУЛЕЙ
     
@@ -288,115 +507,23 @@ class MainHandler:
             "⚡ Что хотите сделать?"
         )
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📋 Перейти к Price Alerts", callback_data="price_alerts")
-        builder.button(text="📊 Текущие цены", callback_data="price_current_prices")
-        builder.button(text="📈 Подробная статистика", callback_data="price_statistics")
-        builder.button(text="ℹ️ Справка", callback_data="price_help_info")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, _PRICE_ALERTS_INFO_KB)
     
     async def show_gas_tracker_menu(self, callback: types.CallbackQuery):
         """Показ меню Gas Tracker."""
-        text = (
-            "⛽ <b>Gas Tracker</b>\n"
-            "<i>Модуль в разработке</i>\n\n"
-            
-            "🚧 <b>Планируемый функционал:</b>\n"
-            "• Мониторинг цен газа Ethereum\n"
-            "• Уведомления при достижении порогов\n"
-            "• Исторические данные\n"
-            "• Рекомендации по оптимальному времени\n\n"
-            
-            "📅 <b>Статус:</b> В разработке\n"
-            "🕐 <b>Планируемый релиз:</b> Скоро"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📈 Попробовать Price Alerts", callback_data="price_alerts")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, _GAS_TRACKER_TEXT, _COMING_SOON_KB)
     
     async def show_whale_tracker_menu(self, callback: types.CallbackQuery):
         """Показ меню Whale Tracker."""
-        text = (
-            "🐋 <b>Whale Tracker</b>\n"
-            "<i>Модуль в разработке</i>\n\n"
-            
-            "🚧 <b>Планируемый функционал:</b>\n"
-            "• Отслеживание крупных транзакций\n"
-            "• Анализ движений китов\n"
-            "• Уведомления о значительных переводах\n"
-            "• Статистика по кошелькам\n\n"
-            
-            "📅 <b>Статус:</b> В разработке\n"
-            "🕐 <b>Планируемый релиз:</b> Скоро"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📈 Попробовать Price Alerts", callback_data="price_alerts")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, _WHALE_TRACKER_TEXT, _COMING_SOON_KB)
     
     async def show_wallet_tracker_menu(self, callback: types.CallbackQuery):
         """Показ меню Wallet Tracker."""
-        text = (
-            "👛 <b>Wallet Tracker</b>\n"
-            "<i>Модуль в разработке</i>\n\n"
-            
-            "🚧 <b>Планируемый функционал:</b>\n"
-            "• Мониторинг кошельков\n"
-            "• Уведомления о транзакциях\n"
-            "• Отслеживание балансов\n"
-            "• Анализ активности\n\n"
-            
-            "📅 <b>Статус:</b> В разработке\n"
-            "🕐 <b>Планируемый релиз:</b> Скоро"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📈 Попробовать Price Alerts", callback_data="price_alerts")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, _WALLET_TRACKER_TEXT, _COMING_SOON_KB)
     
     async def show_settings(self, callback: types.CallbackQuery):
         """Показ настроек."""
-        text = (
-            "⚙️ <b>Настройки</b>\n\n"
-            
-            "🔧 <b>Системные настройки:</b>\n"
-            "• Архитектура: Модульная v2.0\n"
-            "• Кеширование: Встроенное\n"
-            "• События: Упрощенная система\n\n"
-            
-            "📈 <b>Price Alerts:</b>\n"
-            "• Статус: Активен\n"
-            "• Кеш: Встроен в репозиторий\n"
-            "• API: Binance (бесплатный)\n\n"
-            
-            "🎛️ Управление:"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📊 Моя статистика", callback_data="settings_stats")
-        builder.button(text="🔧 Техническая информация", callback_data="about_tech")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _SETTINGS_SCREEN, _SETTINGS_KB)
     
     async def show_about(self, callback: types.CallbackQuery):
         """Показ информации о боте."""
@@ -435,25 +562,17 @@ class MainHandler:
             "• Дополнительные API интеграции\n"
             "• Расширенная аналитика\n\n"
             
-            f"⏰ <b>Время работы:</b> {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+            f"⏰ <b>Время работы:</b> {datetime.now().strftime(_DATETIME_FMT)}"
         )
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📝 Changelog", callback_data="about_changelog")
-        builder.button(text="🔧 Техническая информация", callback_data="about_tech")
-        builder.button(text="📊 Статистика системы", callback_data="cmd_status")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(2, 1, 1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, _ABOUT_KB)
     
     # ДОПОЛНИТЕЛЬНЫЕ ОБРАБОТЧИКИ
     
     async def toggle_notifications(self, callback: types.CallbackQuery):
         """Переключение уведомлений."""
+        # Кнопка находится на экране настроек - перерисовывать его не нужно
         await callback.answer("🔔 Уведомления управляются через настройки Price Alerts")
-        await self.show_settings(callback)
     
     async def show_user_stats(self, callback: types.CallbackQuery):
         """Показ пользовательской статистики."""
@@ -483,60 +602,16 @@ class MainHandler:
                     f"• Загружаем данные...\n\n"
                 )
             except Exception as e:
-                logger.error(f"Error getting user stats: {e}")
+                logger.error("Error getting user stats: %s", e)
                 text += "📈 <b>Price Alerts:</b> Данные недоступны\n\n"
         
-        text += f"📅 <b>Дата регистрации:</b> {datetime.now().strftime('%d.%m.%Y')}"
+        text += f"📅 <b>Дата регистрации:</b> {datetime.now().strftime(_DATE_FMT)}"
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="settings_stats")
-        builder.button(text="◀️ Назад", callback_data="settings")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, _USER_STATS_KB)
     
     async def show_changelog(self, callback: types.CallbackQuery):
         """Показ истории изменений."""
-        text = (
-            "📝 <b>История изменений</b>\n\n"
-            
-            "<b>🚀 Версия 2.0.0</b> (Декабрь 2024)\n"
-            "• Полная реструктуризация проекта\n"
-            "• Модульная архитектура\n"
-            "• Кеш встроен в репозитории\n"
-            "• Упрощена система событий\n"
-            "• Убрана избыточность кода\n"
-            "• Улучшена производительность\n"
-            "• Alert dispatcher встроен в Telegram\n"
-            "• Token manager выделен в отдельный модуль\n\n"
-            
-            "<b>📈 Архитектурные изменения:</b>\n"
-            "• config/ - модульные настройки\n"
-            "• core/ - только общие компоненты\n"
-            "• shared/ - минимальный набор утилит\n"
-            "• modules/ - самодостаточные модули\n\n"
-            
-            "<b>🔧 Технические улучшения:</b>\n"
-            "• PriceAlertsRepository с встроенным кешем\n"
-            "• Упрощенный EventBus без circuit breaker\n"
-            "• Все handlers в telegram модуле\n"
-            "• Изоляция модулей\n\n"
-            
-            "<b>📋 Сохранена функциональность:</b>\n"
-            "• Price Alerts работает полностью\n"
-            "• Все кнопки и команды функциональны\n"
-            "• Telegram интерфейс не изменился\n"
-            "• API интеграции сохранены"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔮 Планы", callback_data="about_roadmap")
-        builder.button(text="◀️ Назад", callback_data="about")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _CHANGELOG_SCREEN, _CHANGELOG_KB)
     
     async def show_tech_info(self, callback: types.CallbackQuery):
         """Показ технической информации."""
@@ -586,14 +661,7 @@ class MainHandler:
             "• Минимизированы зависимости"
         )
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📊 Подробная статистика", callback_data="cmd_status")
-        builder.button(text="📝 Changelog", callback_data="about_changelog")
-        builder.button(text="◀️ Назад", callback_data="about")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, _TECH_INFO_KB)
     
     async def handle_status_actions(self, callback: types.CallbackQuery):
         """Обработка действий в меню статуса."""
@@ -612,103 +680,40 @@ class MainHandler:
         """Детальный статус системы."""
         event_stats = event_bus.get_stats()
         
-        text = (
+        parts = [
             "📊 <b>Детальный статус системы</b>\n\n"
             
             "<b>📡 Event Bus:</b>\n"
             f"• Статус: {'🟢 Работает' if event_stats.get('running', False) else '🔴 Остановлен'}\n"
             f"• Обработчиков: {event_stats.get('total_handlers', 0)}\n"
             f"• Типов событий: {event_stats.get('event_types', 0)}\n"
-        )
+        ]
         
         subscribers = event_stats.get('subscribers', {})
         if subscribers:
-            text += "\n<b>📋 Подписчики событий:</b>\n"
-            for event_type, count in list(subscribers.items())[:5]:  # Показываем первые 5
-                text += f"• {event_type}: {count}\n"
+            parts.append("\n<b>📋 Подписчики событий:</b>\n")
+            # Показываем первые 5
+            parts.extend(f"• {event_type}: {count}\n" for event_type, count in islice(subscribers.items(), 5))
             
             if len(subscribers) > 5:
-                text += f"• ... и еще {len(subscribers) - 5} типов\n"
+                parts.append(f"• ... и еще {len(subscribers) - 5} типов\n")
         
         # Статистика Price Alerts если доступен
         if self.price_alerts_service:
             pa_stats = self.price_alerts_service.get_statistics()
-            text += (
+            parts.append(
                 f"\n<b>📈 Price Alerts детально:</b>\n"
                 f"• Обновлений цен: {pa_stats.get('total_updates', 0)}\n"
                 f"• Неудачных обновлений: {pa_stats.get('failed_updates', 0)}\n"
                 f"• Алертов отправлено: {pa_stats.get('alerts_triggered', 0)}\n"
             )
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="status_details")
-        builder.button(text="◀️ Назад", callback_data="cmd_status")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, "".join(parts), _DETAILED_STATUS_KB)
     
     async def about_roadmap(self, callback: types.CallbackQuery):
         """Показ планов развития."""
-        text = (
-            "🔮 <b>Планы развития</b>\n\n"
-            
-            "<b>📅 Ближайшие планы:</b>\n"
-            "• Завершение Gas Tracker модуля\n"
-            "• Добавление Whale Tracker функционала\n"
-            "• Реализация Wallet Tracker\n"
-            "• Интеграция с premium API\n\n"
-            
-            "<b>🚀 Среднесрочные цели:</b>\n"
-            "• Расширенная аналитика\n"
-            "• Дополнительные биржи\n"
-            "• Мобильные уведомления\n"
-            "• Экспорт данных\n\n"
-            
-            "<b>💡 Долгосрочное видение:</b>\n"
-            "• Мультиплатформенность\n"
-            "• Машинное обучение для прогнозов\n"
-            "• Социальные функции\n"
-            "• API для разработчиков\n\n"
-            
-            "🎯 Архитектура v2.0 подготовлена для всех этих улучшений!"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📈 Попробовать Price Alerts", callback_data="price_alerts")
-        builder.button(text="◀️ Назад", callback_data="about")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _ROADMAP_SCREEN, _ROADMAP_KB)
     
     async def price_help_info(self, callback: types.CallbackQuery):
         """Справка по Price Alerts."""
-        text = (
-            "ℹ️ <b>Справка по Price Alerts</b>\n\n"
-            
-            "📝 <b>Как создать пресет:</b>\n"
-            "1. Нажмите 'Перейти к Price Alerts'\n"
-            "2. Выберите 'Создать пресет'\n"
-            "3. Следуйте шагам мастера\n\n"
-            
-            "🎯 <b>Советы по настройке:</b>\n"
-            "• Процент 1-2% - много сигналов\n"
-            "• Процент 3-5% - оптимально\n"
-            "• Процент 10%+ - только крупные движения\n\n"
-            
-            "⏰ <b>Таймфреймы:</b>\n"
-            "• 1m/5m - для скальпинга\n"
-            "• 15m/1h - для обычной торговли\n"
-            "• 4h/1d - для долгосрочных позиций\n\n"
-            
-            "🔔 Уведомления приходят мгновенно при достижении условий!"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="📈 Перейти к Price Alerts", callback_data="price_alerts")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
\ No newline at end of file
+        await screen_and_answer(callback, _PRICE_HELP_SCREEN, _PRICE_HELP_INFO_KB)
\ No newline at end of file
@@ -1,11 +1,18 @@
 # modules/telegram/handlers/price_alerts_handler.py
 """Полностью рабочие обработчики для Price Alerts."""
 
+import asyncio
+import re
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
 from aiogram import Router, types, F
+from aiogram.filters.callback_data import CallbackData
 from aiogram.fsm.context import FSMContext
-from aiogram.utils.keyboard import InlineKeyboardBuilder
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 
 from shared.events import event_bus, Event
+from .common import edit_and_answer, edit_text, prerender, screen_and_answer
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,32 +27,469 @@ class PresetStates(StatesGroup):
     waiting_interval = State()
     waiting_percent = State()
 
+
+class PresetAction(CallbackData, prefix="pa"):
+    """callback_data кнопок управления пресетом (лимит Telegram - 64 байта, id пресета - UUID из 36 символов)."""
+    action: str
+    preset_id: str
+
+# Ручной ввод процента: "2", "+2.5", "002,5%", ".5" - знак, ведущие нули, точка или запятая, "%" в конце.
+# Экспонента и "_" (1e1, 1_0) не принимаются; форма проверяется до float(), мусор отсекается без исключений
+_PERCENT_RE = re.compile(r'^([+-]?)(?=[.,]?\d)(0*\d{0,3}(?:[.,]\d*)?)\s*%?$')
+
+# Ручной ввод пар: разделители - пробельные символы, запятая и точка с запятой
+_PAIR_SEPARATORS_RE = re.compile(r'[\s,;]+')
+_QUOTE_SUFFIXES = ("USDT", "BUSD", "BTC", "ETH")
+
+# Верхние границы длины сырого ввода: заведомо неподходящий текст отклоняется до strip()/разбора
+_MAX_NAME_INPUT = 100
+_MAX_PAIRS_INPUT = 2000
+
+# Сколько секунд список пресетов пользователя считается актуальным
+_PRESETS_CACHE_TTL = 15
+
+# Повторное нажатие той же кнопки в течение этого времени считается двойным кликом
+_CLICK_DEBOUNCE = 0.5
+_MAX_TRACKED_CLICKS = 10000
+
+# Одновременных запросов к сервису из handlers (чтение данных и создание пресетов)
+_MAX_SERVICE_REQUESTS = 20
+
+# Статические тексты экранов
+_MAIN_MENU_TEXT = (
+    "📈 <b>Price Alerts</b>\n\n"
+    "🚀 <b>Система мониторинга цен в реальном времени</b>\n\n"
+    
+    "🎯 <b>Возможности:</b>\n"
+    "• Создание пресетов для групп токенов\n"
+    "• Мониторинг до 500 пар одновременно\n" 
+    "• Настройка процента изменения\n"
+    "• Множественные таймфреймы\n"
+    "• Группировка уведомлений\n\n"
+    
+    "🔄 Загружаем ваши данные..."
+)
+
+_CREATE_PRESET_TEXT = (
+    "📝 <b>Создание пресета - Шаг 1/4</b>\n\n"
+    
+    "🏷️ <b>Название пресета</b>\n\n"
+    "Введите понятное название для вашего пресета:\n\n"
+    
+    "💡 <b>Примеры хороших названий:</b>\n"
+    "• \"Топ криптовалюты 2%\"\n"
+    "• \"DeFi токены 5%\"\n" 
+    "• \"Альткоины быстрые сигналы\"\n"
+    "• \"Мои любимые монеты\"\n\n"
+    
+    "📝 Введите название (3-50 символов):"
+)
+
+_PERCENT_MANUAL_TEXT = (
+    "📝 <b>Ручной ввод процента</b>\n\n"
+    "Введите процент изменения (от 0.1 до 100):\n"
+    "Примеры: 1.5, 2.3, 7.5"
+)
+
+_USER_PRESETS_LOADING_TEXT = "📋 <b>Мои пресеты</b>\n\n🔄 Загружаем ваши пресеты..."
+
+_CURRENT_PRICES_LOADING_TEXT = "📊 <b>Текущие цены</b>\n\n🔄 Загружаем актуальные данные..."
+
+_STATISTICS_LOADING_TEXT = "📈 <b>Статистика</b>\n\n🔄 Собираем данные..."
+
+_HELP_TEXT = (
+    "ℹ️ <b>Справка по Price Alerts</b>\n\n"
+    
+    "📝 <b>Пресеты:</b>\n"
+    "Группируйте токены по темам или стратегиям\n\n"
+    
+    "📈 <b>Процент изменения:</b>\n"
+    "• 1-2% - много сигналов\n"
+    "• 3-5% - оптимально\n"
+    "• 10%+ - только крупные движения\n\n"
+    
+    "⏰ <b>Таймфреймы:</b>\n"
+    "• 1m/5m - скальпинг\n"
+    "• 15m/1h - свинг-трейдинг\n"
+    "• 4h/1d - позиционная торговля\n\n"
+    
+    "🔔 <b>Уведомления:</b>\n"
+    "Приходят сразу при достижении условий"
+)
+
+_SETTINGS_TEXT = (
+    "⚙️ <b>Настройки Price Alerts</b>\n\n"
+    
+    "🔔 <b>Уведомления:</b> Включены\n"
+    "📱 <b>Группировка:</b> Включена\n"
+    "🔊 <b>Звук:</b> Включен\n"
+    "⏰ <b>Интервал по умолчанию:</b> 15m\n"
+    "📈 <b>Процент по умолчанию:</b> 3%\n\n"
+    
+    "💡 Настройки применятся к новым пресетам"
+)
+
+_EXPORT_TEXT = (
+    "📤 <b>Экспорт данных</b>\n\n"
+    
+    "📊 Доступные форматы:\n"
+    "• JSON - все пресеты и настройки\n"
+    "• CSV - статистика алертов\n"
+    "• TXT - список отслеживаемых пар\n\n"
+    
+    "⚠️ Экспорт данных временно недоступен"
+)
+
+# Шаблоны динамических экранов (подстановка через str.format)
+_NAME_ACCEPTED_TPL = (
+    "✅ <b>Название:</b> {name}\n\n"
+    
+    "📊 <b>Шаг 2/4: Торговые пары</b>\n\n"
+    "Выберите способ добавления торговых пар:"
+)
+
+_INTERVAL_STEP_TPL = (
+    "✅ <b>Выбрано пар:</b> {pairs_count}\n\n"
+    
+    "⏰ <b>Шаг 3/4: Таймфрейм</b>\n\n"
+    "Выберите интервал для анализа цен:\n\n"
+    
+    "💡 <b>Рекомендации:</b>\n"
+    "• 1m - для скальпинга (много сигналов)\n"
+    "• 5m - для краткосрочной торговли\n"
+    "• 15m - оптимальный баланс\n"
+    "• 1h - для среднесрочной торговли\n"
+    "• 4h - для свинг-трейдинга\n"
+    "• 1d - для долгосрочного анализа"
+)
+
+_PERCENT_STEP_TPL = (
+    "✅ <b>Интервал:</b> {interval}\n\n"
+    
+    "📈 <b>Шаг 4/4: Процент изменения</b>\n\n"
+    "Укажите минимальный процент изменения цены для получения уведомлений:\n\n"
+    
+    "💡 <b>Примеры:</b>\n"
+    "• 1% - много сигналов\n"
+    "• 2-3% - оптимально для большинства\n"
+    "• 5%+ - только значительные движения"
+)
+
+_PRESET_CREATING_TPL = (
+    "✅ <b>Пресет создается...</b>\n\n"
+    
+    "📝 <b>Название:</b> {name}\n"
+    "📊 <b>Пар:</b> {pairs_count}\n"
+    "⏰ <b>Интервал:</b> {interval}\n"
+    "📈 <b>Процент:</b> {percent}%\n\n"
+    
+    "🎯 Пресет будет активирован автоматически!\n"
+    "🔔 Вы начнете получать уведомления о значительных изменениях цен."
+)
+
+_MENU_STATS_TPL = (
+    "📈 <b>Price Alerts</b>\n\n"
+    "🚀 <b>Система мониторинга цен в реальном времени</b>\n\n"
+    
+    "📊 <b>Ваша статистика:</b>\n"
+    "• Пресетов создано: {total}\n"
+    "• Активных пресетов: {active}\n"
+    "• Отслеживаемых пар: {pairs}\n\n"
+    
+    "🎯 <b>Статус мониторинга:</b> {status}\n\n"
+    
+    "⚡ Выберите действие:"
+)
+
+# Статические экраны разбираются один раз при импорте - без HTML-парсинга на стороне Telegram
+_MAIN_MENU_SCREEN = prerender(_MAIN_MENU_TEXT)
+_CREATE_PRESET_SCREEN = prerender(_CREATE_PRESET_TEXT)
+_PERCENT_MANUAL_SCREEN = prerender(_PERCENT_MANUAL_TEXT)
+_USER_PRESETS_LOADING_SCREEN = prerender(_USER_PRESETS_LOADING_TEXT)
+_CURRENT_PRICES_LOADING_SCREEN = prerender(_CURRENT_PRICES_LOADING_TEXT)
+_STATISTICS_LOADING_SCREEN = prerender(_STATISTICS_LOADING_TEXT)
+_HELP_SCREEN = prerender(_HELP_TEXT)
+_SETTINGS_SCREEN = prerender(_SETTINGS_TEXT)
+_EXPORT_SCREEN = prerender(_EXPORT_TEXT)
+
+# Статические клавиатуры
+_MAIN_MENU_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="➕ Создать пресет", callback_data="price_create_preset"),
+        InlineKeyboardButton(text="📋 Мои пресеты", callback_data="price_my_presets"),
+    ],
+    [
+        InlineKeyboardButton(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring"),
+        InlineKeyboardButton(text="⏹️ Остановить мониторинг", callback_data="price_stop_monitoring"),
+    ],
+    [
+        InlineKeyboardButton(text="📊 Текущие цены", callback_data="price_current_prices"),
+        InlineKeyboardButton(text="📈 Статистика", callback_data="price_statistics"),
+    ],
+    [
+        InlineKeyboardButton(text="⚙️ Настройки", callback_data="price_settings"),
+        InlineKeyboardButton(text="ℹ️ Помощь", callback_data="price_help"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_CANCEL_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="price_alerts")],
+])
+
+_PAIRS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🔝 Топ 10 пар", callback_data="pairs_top10"),
+        InlineKeyboardButton(text="📈 Топ 25 пар", callback_data="pairs_top25"),
+    ],
+    [
+        InlineKeyboardButton(text="💰 Топ 50 пар", callback_data="pairs_top50"),
+        InlineKeyboardButton(text="📊 По объему торгов", callback_data="pairs_volume"),
+    ],
+    [InlineKeyboardButton(text="🏷️ Популярные категории", callback_data="pairs_categories")],
+    [InlineKeyboardButton(text="✏️ Ввести вручную", callback_data="pairs_manual")],
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="price_alerts")],
+])
+
+_INTERVAL_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="1m ⚡", callback_data="interval_1m"),
+        InlineKeyboardButton(text="5m 🔥", callback_data="interval_5m"),
+        InlineKeyboardButton(text="15m ⭐", callback_data="interval_15m"),
+    ],
+    [
+        InlineKeyboardButton(text="1h 📈", callback_data="interval_1h"),
+        InlineKeyboardButton(text="4h 📊", callback_data="interval_4h"),
+        InlineKeyboardButton(text="1d 📉", callback_data="interval_1d"),
+    ],
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="price_alerts")],
+])
+
+_PERCENT_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="1%", callback_data="percent_1"),
+        InlineKeyboardButton(text="2%", callback_data="percent_2"),
+        InlineKeyboardButton(text="3%", callback_data="percent_3"),
+    ],
+    [
+        InlineKeyboardButton(text="5%", callback_data="percent_5"),
+        InlineKeyboardButton(text="10%", callback_data="percent_10"),
+    ],
+    [InlineKeyboardButton(text="✏️ Ввести вручную", callback_data="percent_manual")],
+    [InlineKeyboardButton(text="❌ Отмена", callback_data="price_alerts")],
+])
+
+_PRESET_CREATED_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="📋 Мои пресеты", callback_data="price_my_presets")],
+    [InlineKeyboardButton(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring")],
+    [InlineKeyboardButton(text="◀️ Главное меню", callback_data="price_alerts")],
+])
+
+_CREATE_BACK_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="➕ Создать пресет", callback_data="price_create_preset")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_NO_PRESETS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="➕ Создать первый пресет", callback_data="price_create_preset")],
+    [InlineKeyboardButton(text="ℹ️ Помощь", callback_data="price_help")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_PRICES_LOADING_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔄 Обновить", callback_data="price_current_prices")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_STATISTICS_LOADING_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="🔄 Обновить", callback_data="price_statistics")],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_SETTINGS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🔔 Уведомления", callback_data="settings_notifications"),
+        InlineKeyboardButton(text="📱 Группировка", callback_data="settings_grouping"),
+    ],
+    [
+        InlineKeyboardButton(text="🔊 Звук", callback_data="settings_sound"),
+        InlineKeyboardButton(text="⚙️ Дефолты", callback_data="settings_defaults"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_BACK_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_MENU_MONITORING_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="➕ Создать пресет", callback_data="price_create_preset"),
+        InlineKeyboardButton(text="📋 Мои пресеты", callback_data="price_my_presets"),
+    ],
+    [InlineKeyboardButton(text="⏹️ Остановить мониторинг", callback_data="price_stop_monitoring")],
+    [
+        InlineKeyboardButton(text="📊 Текущие цены", callback_data="price_current_prices"),
+        InlineKeyboardButton(text="📈 Статистика", callback_data="price_statistics"),
+    ],
+    [
+        InlineKeyboardButton(text="⚙️ Настройки", callback_data="price_settings"),
+        InlineKeyboardButton(text="ℹ️ Помощь", callback_data="price_help"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_MENU_IDLE_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="➕ Создать пресет", callback_data="price_create_preset"),
+        InlineKeyboardButton(text="📋 Мои пресеты", callback_data="price_my_presets"),
+    ],
+    [InlineKeyboardButton(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring")],
+    [
+        InlineKeyboardButton(text="📊 Текущие цены", callback_data="price_current_prices"),
+        InlineKeyboardButton(text="📈 Статистика", callback_data="price_statistics"),
+    ],
+    [
+        InlineKeyboardButton(text="⚙️ Настройки", callback_data="price_settings"),
+        InlineKeyboardButton(text="ℹ️ Помощь", callback_data="price_help"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="main_menu")],
+])
+
+_PRICES_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🔄 Обновить", callback_data="price_current_prices"),
+        InlineKeyboardButton(text="➕ Создать алерт", callback_data="price_create_preset"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+_STATISTICS_KB = InlineKeyboardMarkup(inline_keyboard=[
+    [
+        InlineKeyboardButton(text="🔄 Обновить", callback_data="price_statistics"),
+        InlineKeyboardButton(text="📊 Текущие цены", callback_data="price_current_prices"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+])
+
+# callback_data кнопок выбора -> значение (без разбора строки на каждый клик)
+_INTERVALS = {
+    f"interval_{interval}": interval
+    for interval in ("1m", "5m", "15m", "1h", "4h", "1d")
+}
+_QUICK_PERCENTS = {
+    "percent_1": 1.0,
+    "percent_2": 2.0,
+    "percent_3": 3.0,
+    "percent_5": 5.0,
+    "percent_10": 10.0,
+}
+
+# Нижние строки клавиатуры списка пресетов (общие для всех пользователей)
+_PRESETS_FOOTER_ROWS = (
+    [
+        InlineKeyboardButton(text="➕ Создать пресет", callback_data="price_create_preset"),
+        InlineKeyboardButton(text="🚀 Запустить все", callback_data="price_start_monitoring"),
+    ],
+    [InlineKeyboardButton(text="◀️ Назад", callback_data="price_alerts")],
+)
+
+# Наборы пар для быстрого выбора (мок популярных пар для демонстрации): callback_data -> пары
+_TOP10_PAIRS = (
+    "BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT",
+    "SOLUSDT", "DOGEUSDT", "DOTUSDT", "AVAXUSDT", "SHIBUSDT",
+)
+_PAIRS_BY_CALLBACK = {
+    "pairs_top10": _TOP10_PAIRS,
+    "pairs_top25": _TOP10_PAIRS + (
+        "MATICUSDT", "LTCUSDT", "LINKUSDT", "UNIUSDT", "ATOMUSDT",
+        "FILUSDT", "XLMUSDT", "VETUSDT", "ICPUSDT", "ETCUSDT",
+        "ALGOUSDT", "TRXUSDT", "HBARUSDT", "EOSUSDT", "AAVEUSDT",
+    ),
+    "pairs_top50": ("BTCUSDT", "ETHUSDT", "BNBUSDT") + tuple(f"TOKEN{i}USDT" for i in range(1, 48)),
+    "pairs_volume": ("BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"),
+    "pairs_categories": ("BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT"),
+}
+
+# Отображение пресета по is_active: (статус, текст кнопки действия, действие PresetAction)
+_PRESET_STATE = {
+    True: ("🟢", "⏸️ Приостановить", "deactivate"),
+    False: ("🔴", "▶️ Активировать", "activate"),
+}
+
+def _parse_percent(text: Optional[str]) -> Optional[float]:
+    """Процент из ручного ввода или None, если форма не подходит (диапазон проверяет вызывающий)."""
+    match = _PERCENT_RE.match(text.strip()) if text else None
+    if not match:
+        return None
+    
+    sign, number = match.groups()
+    return float(sign + number.replace(',', '.'))
+
 class PriceAlertsHandler:
     """Полностью функциональные обработчики Price Alerts."""
     
+    __slots__ = (
+        "router", "_response_cache", "_presets_cache", "_inflight_requests", "_service_semaphore",
+        "_recent_clicks", "_callback_routes", "_preset_actions"
+    )
+    
     def __init__(self):
         self.router = Router()
         
         # Подписываемся на ответы от сервиса
-        event_bus.subscribe("price_alerts.preset_created", self._handle_preset_created)
-        event_bus.subscribe("price_alerts.user_presets_response", self._handle_user_presets_response)
-        event_bus.subscribe("price_alerts.current_prices_response", self._handle_prices_response)
-        event_bus.subscribe("price_alerts.statistics_response", self._handle_statistics_response)
+        event_bus.subscribe_many({
+            "price_alerts.preset_created": self._handle_preset_created,
+            "price_alerts.user_presets_response": self._handle_user_presets_response,
+            "price_alerts.current_prices_response": self._handle_prices_response,
+            "price_alerts.statistics_response": self._handle_statistics_response,
+            "price_alerts.preset_activated": self._handle_preset_changed,
+            "price_alerts.preset_deactivated": self._handle_preset_changed,
+            "price_alerts.preset_deleted": self._handle_preset_changed,
+        })
         
         # Кеш для ответов
         self._response_cache = {}
+        
+        # Последние полученные пресеты пользователей: user_id -> (время, пресеты)
+        self._presets_cache: Dict[int, Tuple[float, list]] = {}
+        
+        # Выполняющиеся запросы к сервису: (user_id, тип события)
+        self._inflight_requests: Set[Tuple[int, str]] = set()
+        
+        # Ограничение параллельных обращений к БД из handlers
+        self._service_semaphore = asyncio.Semaphore(_MAX_SERVICE_REQUESTS)
+        
+        # Последние нажатия изменяющих кнопок: (user_id, callback_data) -> время
+        self._recent_clicks: Dict[Tuple[int, str], float] = {}
+        
+        # Простые callback'и меню: callback_data -> обработчик
+        self._callback_routes = {
+            "price_alerts": self.show_main_menu,
+            "price_my_presets": self.show_user_presets,
+            "price_start_monitoring": self.start_monitoring,
+            "price_stop_monitoring": self.stop_monitoring,
+            "price_statistics": self.show_statistics,
+            "price_current_prices": self.show_current_prices,
+            "price_help": self.show_help,
+            "price_settings": self.show_settings,
+            "price_export": self.export_data,
+        }
+        
+        # Действия над пресетом: PresetAction.action -> обработчик
+        self._preset_actions = {
+            "activate": self.activate_preset,
+            "deactivate": self.deactivate_preset,
+            "delete": self.delete_preset,
+            "edit": self.edit_preset,
+        }
     
     def register_handlers(self, dp):
         """Регистрация ВСЕХ обработчиков."""
         
-        # ОСНОВНЫЕ КОМАНДЫ
-        self.router.callback_query(F.data == "price_alerts")(self.show_main_menu)
+        # ОСНОВНЫЕ КОМАНДЫ И ДОПОЛНИТЕЛЬНЫЕ ФУНКЦИИ - один фильтр на все пункты меню
+        self.router.callback_query(F.data.in_(self._callback_routes.keys()))(self._dispatch_callback)
         self.router.callback_query(F.data == "price_create_preset")(self.start_create_preset)
-        self.router.callback_query(F.data == "price_my_presets")(self.show_user_presets)
-        self.router.callback_query(F.data == "price_start_monitoring")(self.start_monitoring)
-        self.router.callback_query(F.data == "price_stop_monitoring")(self.stop_monitoring)
-        self.router.callback_query(F.data == "price_statistics")(self.show_statistics)
-        self.router.callback_query(F.data == "price_current_prices")(self.show_current_prices)
         
         # СОЗДАНИЕ ПРЕСЕТА - ВСЕ ШАГИ
         self.router.message(PresetStates.waiting_name)(self.process_preset_name)
@@ -56,99 +500,120 @@ class PriceAlertsHandler:
         self.router.message(PresetStates.waiting_percent)(self.process_percent)
         
         # УПРАВЛЕНИЕ ПРЕСЕТАМИ
-        self.router.callback_query(F.data.startswith("activate_"))(self.activate_preset)
-        self.router.callback_query(F.data.startswith("deactivate_"))(self.deactivate_preset)
-        self.router.callback_query(F.data.startswith("delete_preset_"))(self.delete_preset)
-        self.router.callback_query(F.data.startswith("edit_preset_"))(self.edit_preset)
-        
-        # ДОПОЛНИТЕЛЬНЫЕ ФУНКЦИИ
-        self.router.callback_query(F.data == "price_help")(self.show_help)
-        self.router.callback_query(F.data == "price_settings")(self.show_settings)
-        self.router.callback_query(F.data == "price_export")(self.export_data)
+        self.router.callback_query(PresetAction.filter())(self._dispatch_preset_action)
+
         
         dp.include_router(self.router)
 
-    async def show_main_menu(self, callback: types.CallbackQuery):
-        """Главное меню Price Alerts."""
-        user_id = callback.from_user.id
+    async def _dispatch_callback(self, callback: types.CallbackQuery):
+        """Диспетчеризация callback'ов меню по таблице."""
+        await self._callback_routes[callback.data](callback)
+    
+    async def _dispatch_preset_action(self, callback: types.CallbackQuery, callback_data: PresetAction):
+        """Диспетчеризация действий над пресетом по таблице."""
+        handler = self._preset_actions.get(callback_data.action)
+        if handler is None:
+            await callback.answer()
+            return
         
-        # Запрашиваем данные
-        await event_bus.publish(Event(
-            type="price_alerts.get_user_presets",
-            data={"user_id": user_id},
-            source_module="telegram"
-        ))
+        await handler(callback, callback_data)
+    
+    def _get_cached_presets(self, user_id: int) -> Optional[list]:
+        """Пресеты пользователя из кеша, если они еще актуальны."""
+        cached = self._presets_cache.get(user_id)
+        if cached and time.monotonic() - cached[0] < _PRESETS_CACHE_TTL:
+            return cached[1]
+        return None
+    
+    def _invalidate_presets(self, user_id: int) -> None:
+        """Сброс кеша пресетов после изменений."""
+        self._presets_cache.pop(user_id, None)
+    
+    async def _request_once(self, user_id: int, event_type: str, data: Dict[str, Any]) -> None:
+        """Запрос к сервису: пока такой же запрос пользователя выполняется, повторный не отправляется."""
+        key = (user_id, event_type)
+        if key in self._inflight_requests:
+            # Ответ уже запрошен и будет отрисован в последнем сохраненном контексте
+            return
         
-        await event_bus.publish(Event(
-            type="price_alerts.get_statistics",
-            data={"user_id": user_id},
-            source_module="telegram"
-        ))
+        self._inflight_requests.add(key)
+        try:
+            async with self._service_semaphore:
+                await event_bus.publish(Event(type=event_type, data=data, source_module="telegram"))
+        finally:
+            self._inflight_requests.discard(key)
+    
+    def _is_repeated_click(self, callback: types.CallbackQuery) -> bool:
+        """Проверка двойного нажатия: повтор той же кнопки тем же пользователем сразу после первого."""
+        now = time.monotonic()
+        key = (callback.from_user.id, callback.data)
         
-        text = (
-            "📈 <b>Price Alerts</b>\n\n"
-            "🚀 <b>Система мониторинга цен в реальном времени</b>\n\n"
-            
-            "🎯 <b>Возможности:</b>\n"
-            "• Создание пресетов для групп токенов\n"
-            "• Мониторинг до 500 пар одновременно\n" 
-            "• Настройка процента изменения\n"
-            "• Множественные таймфреймы\n"
-            "• Группировка уведомлений\n\n"
-            
-            "🔄 Загружаем ваши данные..."
-        )
+        if now - self._recent_clicks.get(key, 0.0) < _CLICK_DEBOUNCE:
+            return True
+        
+        if len(self._recent_clicks) >= _MAX_TRACKED_CLICKS:
+            self._recent_clicks = {
+                k: t for k, t in self._recent_clicks.items() if now - t < _CLICK_DEBOUNCE
+            }
+        
+        self._recent_clicks[key] = now
+        return False
+    
+    def _patch_cached_presets(self, user_id: int, preset_id: str, is_active: Optional[bool]) -> None:
+        """Применение изменения пресета к кешу без повторного запроса (is_active=None - удаление)."""
+        cached = self._presets_cache.get(user_id)
+        if not cached:
+            return
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="➕ Создать пресет", callback_data="price_create_preset")
-        builder.button(text="📋 Мои пресеты", callback_data="price_my_presets")
-        builder.button(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring")
-        builder.button(text="⏹️ Остановить мониторинг", callback_data="price_stop_monitoring")
-        builder.button(text="📊 Текущие цены", callback_data="price_current_prices")
-        builder.button(text="📈 Статистика", callback_data="price_statistics")
-        builder.button(text="⚙️ Настройки", callback_data="price_settings")
-        builder.button(text="ℹ️ Помощь", callback_data="price_help")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(2, 2, 2, 2, 1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
-        
-        # Сохраняем контекст для обновления
+        if is_active is None:
+            presets = [p for p in cached[1] if str(p.get('id')) != preset_id]
+        else:
+            presets = [
+                dict(p, is_active=is_active) if str(p.get('id')) == preset_id else p
+                for p in cached[1]
+            ]
+        
+        self._presets_cache[user_id] = (cached[0], presets)
+    
+    async def show_main_menu(self, callback: types.CallbackQuery, notice: Optional[str] = None):
+        """Главное меню Price Alerts (notice - текст ответа на callback)."""
+        user_id = callback.from_user.id
+        
+        # Свежие данные уже есть - рисуем меню сразу, без запроса к сервису
+        presets = self._get_cached_presets(user_id)
+        if presets is not None:
+            await self._update_main_menu_with_presets(callback.message, presets)
+            await callback.answer(notice)
+            return
+        
+        await screen_and_answer(callback, _MAIN_MENU_SCREEN, _MAIN_MENU_KB, notice)
+        
+        # Сохраняем контекст для обновления (до запроса - ответ может прийти сразу)
         self._response_cache[user_id] = {
             "type": "main_menu",
             "message": callback.message
         }
+        
+        # Запрашиваем данные
+        await self._request_once(user_id, "price_alerts.get_user_presets", {"user_id": user_id})
     
     async def start_create_preset(self, callback: types.CallbackQuery, state: FSMContext):
         """Начало создания пресета."""
         await state.set_state(PresetStates.waiting_name)
+        # Данные брошенного ранее мастера не переносим в новый
+        await state.set_data({})
         
-        text = (
-            "📝 <b>Создание пресета - Шаг 1/4</b>\n\n"
-            
-            "🏷️ <b>Название пресета</b>\n\n"
-            "Введите понятное название для вашего пресета:\n\n"
-            
-            "💡 <b>Примеры хороших названий:</b>\n"
-            "• \"Топ криптовалюты 2%\"\n"
-            "• \"DeFi токены 5%\"\n" 
-            "• \"Альткоины быстрые сигналы\"\n"
-            "• \"Мои любимые монеты\"\n\n"
-            
-            "📝 Введите название (3-50 символов):"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="❌ Отмена", callback_data="price_alerts")
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _CREATE_PRESET_SCREEN, _CANCEL_KB)
     
     async def process_preset_name(self, message: types.Message, state: FSMContext):
         """Обработка названия пресета."""
         try:
-            preset_name = message.text.strip()
+            raw = message.text or ""
+            if len(raw) > _MAX_NAME_INPUT:
+                await message.answer("❌ Название слишком длинное (максимум 50 символов). Попробуйте еще раз:")
+                return
+            
+            preset_name = raw.strip()
             
             # Валидация
             if len(preset_name) < 3:
@@ -162,48 +627,15 @@ class PriceAlertsHandler:
             await state.update_data(preset_name=preset_name)
             await state.set_state(PresetStates.waiting_pairs)
             
-            text = (
-                f"✅ <b>Название:</b> {preset_name}\n\n"
-                
-                "📊 <b>Шаг 2/4: Торговые пары</b>\n\n"
-                "Выберите способ добавления торговых пар:"
-            )
-            
-            builder = InlineKeyboardBuilder()
-            builder.button(text="🔝 Топ 10 пар", callback_data="pairs_top10")
-            builder.button(text="📈 Топ 25 пар", callback_data="pairs_top25")
-            builder.button(text="💰 Топ 50 пар", callback_data="pairs_top50")
-            builder.button(text="📊 По объему торгов", callback_data="pairs_volume")
-            builder.button(text="🏷️ Популярные категории", callback_data="pairs_categories")
-            builder.button(text="✏️ Ввести вручную", callback_data="pairs_manual")
-            builder.button(text="❌ Отмена", callback_data="price_alerts")
-            builder.adjust(2, 2, 1, 1, 1)
-            
-            await message.answer(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await message.answer(_NAME_ACCEPTED_TPL.format(name=preset_name), reply_markup=_PAIRS_KB)
             
         except Exception as e:
-            logger.error(f"Error processing preset name: {e}")
+            logger.error("Error processing preset name: %s", e)
             await message.answer("❌ Ошибка обработки названия. Попробуйте еще раз:")
     
     async def process_pairs_selection(self, callback: types.CallbackQuery, state: FSMContext):
         """Обработка выбора пар."""
-        selection = callback.data.split("_")[1]
-        
-        # Мокаем популярные пары для демонстрации
-        pairs_data = {
-            "top10": ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT", 
-                     "SOLUSDT", "DOGEUSDT", "DOTUSDT", "AVAXUSDT", "SHIBUSDT"],
-            "top25": ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT", 
-                     "SOLUSDT", "DOGEUSDT", "DOTUSDT", "AVAXUSDT", "SHIBUSDT",
-                     "MATICUSDT", "LTCUSDT", "LINKUSDT", "UNIUSDT", "ATOMUSDT",
-                     "FILUSDT", "XLMUSDT", "VETUSDT", "ICPUSDT", "ETCUSDT",
-                     "ALGOUSDT", "TRXUSDT", "HBARUSDT", "EOSUSDT", "AAVEUSDT"],
-            "top50": ["BTCUSDT", "ETHUSDT", "BNBUSDT"] + [f"TOKEN{i}USDT" for i in range(1, 48)],
-            "volume": ["BTCUSDT", "ETHUSDT", "BNBUSDT", "XRPUSDT", "ADAUSDT"],
-            "categories": ["BTCUSDT", "ETHUSDT", "BNBUSDT", "ADAUSDT", "SOLUSDT"]
-        }
-        
-        selected_pairs = pairs_data.get(selection, pairs_data["top10"])
+        selected_pairs = list(_PAIRS_BY_CALLBACK.get(callback.data, _TOP10_PAIRS))
         
         await state.update_data(pairs=selected_pairs)
         await self._show_interval_selection(callback, state, len(selected_pairs))
@@ -211,18 +643,23 @@ class PriceAlertsHandler:
     async def process_manual_pairs(self, message: types.Message, state: FSMContext):
         """Обработка ручного ввода пар."""
         try:
-            pairs_text = message.text.strip().upper()
+            raw = message.text or ""
+            if len(raw) > _MAX_PAIRS_INPUT:
+                await message.answer(
+                    "❌ Слишком длинный список!\n"
+                    "Максимум 100 пар на пресет.\n\n"
+                    "Введите меньше пар:"
+                )
+                return
+            
+            pairs_text = raw.upper()
             
-            # Парсим пары
-            pairs = []
-            for pair in pairs_text.replace(",", " ").replace(";", " ").split():
-                pair = pair.strip()
-                if pair:
-                    # Добавляем USDT если не указано
-                    if not pair.endswith("USDT"):
-                        if not any(pair.endswith(suffix) for suffix in ["USDT", "BUSD", "BTC", "ETH"]):
-                            pair += "USDT"
-                    pairs.append(pair)
+            # Парсим пары, добавляя USDT если котируемая валюта не указана
+            pairs = [
+                pair if pair.endswith(_QUOTE_SUFFIXES) else pair + "USDT"
+                for pair in _PAIR_SEPARATORS_RE.split(pairs_text)
+                if pair
+            ]
             
             # Валидация
             if not pairs:
@@ -248,115 +685,65 @@ class PriceAlertsHandler:
             await self._show_interval_selection(message, state, len(pairs))
             
         except Exception as e:
-            logger.error(f"Error processing manual pairs: {e}")
+            logger.error("Error processing manual pairs: %s", e)
             await message.answer("❌ Ошибка обработки пар. Попробуйте еще раз:")
     
     async def _show_interval_selection(self, event, state: FSMContext, pairs_count: int):
         """Показ выбора интервала."""
         await state.set_state(PresetStates.waiting_interval)
         
-        text = (
-            f"✅ <b>Выбрано пар:</b> {pairs_count}\n\n"
-            
-            "⏰ <b>Шаг 3/4: Таймфрейм</b>\n\n"
-            "Выберите интервал для анализа цен:\n\n"
-            
-            "💡 <b>Рекомендации:</b>\n"
-            "• 1m - для скальпинга (много сигналов)\n"
-            "• 5m - для краткосрочной торговли\n"
-            "• 15m - оптимальный баланс\n"
-            "• 1h - для среднесрочной торговли\n"
-            "• 4h - для свинг-трейдинга\n"
-            "• 1d - для долгосрочного анализа"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="1m ⚡", callback_data="interval_1m")
-        builder.button(text="5m 🔥", callback_data="interval_5m")
-        builder.button(text="15m ⭐", callback_data="interval_15m")
-        builder.button(text="1h 📈", callback_data="interval_1h")
-        builder.button(text="4h 📊", callback_data="interval_4h")
-        builder.button(text="1d 📉", callback_data="interval_1d")
-        builder.button(text="❌ Отмена", callback_data="price_alerts")
-        builder.adjust(3, 3, 1)
+        text = _INTERVAL_STEP_TPL.format(pairs_count=pairs_count)
         
         if hasattr(event, 'message'):
-            await event.answer(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await event.answer(text, reply_markup=_INTERVAL_KB)
         else:
-            await event.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-            await event.answer()
+            await edit_and_answer(event, text, _INTERVAL_KB)
     
     async def process_interval(self, callback: types.CallbackQuery, state: FSMContext):
         """Обработка выбора интервала."""
-        interval = callback.data.split("_")[1]
+        interval = _INTERVALS.get(callback.data)
+        if interval is None:
+            await callback.answer()
+            return
+        
         await state.update_data(interval=interval)
         await state.set_state(PresetStates.waiting_percent)
         
-        data = await state.get_data()
-        pairs_count = len(data.get('pairs', []))
+        text = _PERCENT_STEP_TPL.format(interval=interval)
         
-        text = (
-            f"✅ <b>Интервал:</b> {interval}\n\n"
-            
-            "📈 <b>Шаг 4/4: Процент изменения</b>\n\n"
-            "Укажите минимальный процент изменения цены для получения уведомлений:\n\n"
-            
-            "💡 <b>Примеры:</b>\n"
-            "• 1% - много сигналов\n"
-            "• 2-3% - оптимально для большинства\n"
-            "• 5%+ - только значительные движения"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="1%", callback_data="percent_1")
-        builder.button(text="2%", callback_data="percent_2")
-        builder.button(text="3%", callback_data="percent_3")
-        builder.button(text="5%", callback_data="percent_5")
-        builder.button(text="10%", callback_data="percent_10")
-        builder.button(text="✏️ Ввести вручную", callback_data="percent_manual")
-        builder.button(text="❌ Отмена", callback_data="price_alerts")
-        builder.adjust(3, 2, 1, 1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await edit_and_answer(callback, text, _PERCENT_KB)
     
     async def process_quick_percent(self, callback: types.CallbackQuery, state: FSMContext):
         """Обработка быстрого выбора процента."""
-        if callback.data == "percent_manual":
-            text = (
-                "📝 <b>Ручной ввод процента</b>\n\n"
-                "Введите процент изменения (от 0.1 до 100):\n"
-                "Примеры: 1.5, 2.3, 7.5"
-            )
-            
-            builder = InlineKeyboardBuilder()
-            builder.button(text="❌ Отмена", callback_data="price_alerts")
-            
-            await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+        if self._is_repeated_click(callback):
             await callback.answer()
             return
         
-        # Извлекаем процент
-        percent = float(callback.data.split("_")[1])
+        if callback.data == "percent_manual":
+            await screen_and_answer(callback, _PERCENT_MANUAL_SCREEN, _CANCEL_KB)
+            return
+        
+        percent = _QUICK_PERCENTS.get(callback.data)
+        if percent is None:
+            await callback.answer()
+            return
         
         # Завершаем создание пресета
         await self._complete_preset_creation(callback, state, percent)
     
     async def process_percent(self, message: types.Message, state: FSMContext):
         """Обработка ручного ввода процента."""
-        try:
-            percent_text = message.text.strip().replace('%', '').replace(',', '.')
-            percent = float(percent_text)
-            
-            if percent <= 0 or percent > 100:
-                await message.answer("❌ Процент должен быть от 0.1% до 100%. Попробуйте еще раз:")
-                return
-            
-            # Завершаем создание пресета
-            await self._complete_preset_creation(message, state, percent)
-            
-        except ValueError:
+        percent = _parse_percent(message.text)
+        if percent is None:
             await message.answer("❌ Некорректное число! Введите число (например: 2.5):")
+            return
+        
+        if percent <= 0 or percent > 100:
+            await message.answer("❌ Процент должен быть от 0.1% до 100%. Попробуйте еще раз:")
+            return
+        
+        # Завершаем создание пресета
+        await self._complete_preset_creation(message, state, percent)
     
     async def _complete_preset_creation(self, event, state: FSMContext, percent: float):
         """Завершение создания пресета."""
@@ -373,44 +760,35 @@ class PriceAlertsHandler:
             # Создаем пресет через сервис
             user_id = event.from_user.id if hasattr(event, 'from_user') else event.message.chat.id
             
-            await event_bus.publish(Event(
-                type="price_alerts.create_preset",
-                data={
-                    "user_id": user_id,
-                    "preset_data": preset_data
-                },
-                source_module="telegram"
-            ))
+            self._invalidate_presets(user_id)
+            
+            async with self._service_semaphore:
+                await event_bus.publish(Event(
+                    type="price_alerts.create_preset",
+                    data={
+                        "user_id": user_id,
+                        "preset_data": preset_data
+                    },
+                    source_module="telegram"
+                ))
             
             # Показываем подтверждение
-            text = (
-                "✅ <b>Пресет создается...</b>\n\n"
-                
-                f"📝 <b>Название:</b> {preset_data['preset_name']}\n"
-                f"📊 <b>Пар:</b> {len(preset_data['symbols'])}\n"
-                f"⏰ <b>Интервал:</b> {preset_data['interval']}\n"
-                f"📈 <b>Процент:</b> {preset_data['percent_threshold']}%\n\n"
-                
-                "🎯 Пресет будет активирован автоматически!\n"
-                "🔔 Вы начнете получать уведомления о значительных изменениях цен."
+            text = _PRESET_CREATING_TPL.format(
+                name=preset_data['preset_name'],
+                pairs_count=len(preset_data['symbols']),
+                interval=preset_data['interval'],
+                percent=preset_data['percent_threshold']
             )
             
-            builder = InlineKeyboardBuilder()
-            builder.button(text="📋 Мои пресеты", callback_data="price_my_presets")
-            builder.button(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring")
-            builder.button(text="◀️ Главное меню", callback_data="price_alerts")
-            builder.adjust(1)
-            
             if hasattr(event, 'message'):
-                await event.answer(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+                await event.answer(text, reply_markup=_PRESET_CREATED_KB)
             else:
-                await event.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-                await event.answer()
+                await edit_and_answer(event, text, _PRESET_CREATED_KB)
             
             await state.clear()
             
         except Exception as e:
-            logger.error(f"Error completing preset creation: {e}")
+            logger.error("Error completing preset creation: %s", e)
             error_text = "❌ Ошибка при создании пресета. Попробуйте позже."
             
             if hasattr(event, 'message'):
@@ -418,116 +796,118 @@ class PriceAlertsHandler:
             else:
                 await event.message.answer(error_text)
     
-    async def show_user_presets(self, callback: types.CallbackQuery):
-        """Показ пресетов пользователя."""
+    async def show_user_presets(self, callback: types.CallbackQuery, notice: Optional[str] = None):
+        """Показ пресетов пользователя (notice - текст ответа на callback)."""
         user_id = callback.from_user.id
         
-        # Запрашиваем пресеты
-        await event_bus.publish(Event(
-            type="price_alerts.get_user_presets",
-            data={"user_id": user_id},
-            source_module="telegram"
-        ))
-        
-        text = "📋 <b>Мои пресеты</b>\n\n🔄 Загружаем ваши пресеты..."
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="➕ Создать пресет", callback_data="price_create_preset")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(1)
+        presets = self._get_cached_presets(user_id)
+        if presets is not None:
+            await self._update_presets_display(callback.message, presets)
+            await callback.answer(notice)
+            return
         
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _USER_PRESETS_LOADING_SCREEN, _CREATE_BACK_KB, notice)
         
-        # Сохраняем контекст
+        # Сохраняем контекст (до запроса - ответ может прийти сразу)
         self._response_cache[user_id] = {
             "type": "user_presets",
             "message": callback.message
         }
+        
+        # Запрашиваем пресеты
+        await self._request_once(user_id, "price_alerts.get_user_presets", {"user_id": user_id})
     
     async def start_monitoring(self, callback: types.CallbackQuery):
         """Запуск мониторинга."""
+        if self._is_repeated_click(callback):
+            await callback.answer()
+            return
+        
+        self._invalidate_presets(callback.from_user.id)
+        
         await event_bus.publish(Event(
             type="price_alerts.start_monitoring",
             data={"user_id": callback.from_user.id},
             source_module="telegram"
         ))
         
-        await callback.answer("🚀 Мониторинг запущен! Вы будете получать уведомления.")
-        
-        # Обновляем главное меню
-        await self.show_main_menu(callback)
+        # Обновляем главное меню (один ответ на callback)
+        await self.show_main_menu(callback, "🚀 Мониторинг запущен! Вы будете получать уведомления.")
     
     async def stop_monitoring(self, callback: types.CallbackQuery):
         """Остановка мониторинга."""
+        if self._is_repeated_click(callback):
+            await callback.answer()
+            return
+        
+        self._invalidate_presets(callback.from_user.id)
+        
         await event_bus.publish(Event(
             type="price_alerts.stop_monitoring",
             data={"user_id": callback.from_user.id},
             source_module="telegram"
         ))
         
-        await callback.answer("⏹️ Мониторинг остановлен.")
-        
-        # Обновляем главное меню
-        await self.show_main_menu(callback)
+        # Обновляем главное меню (один ответ на callback)
+        await self.show_main_menu(callback, "⏹️ Мониторинг остановлен.")
     
     async def show_current_prices(self, callback: types.CallbackQuery):
         """Показ текущих цен."""
         user_id = callback.from_user.id
         
-        # Запрашиваем текущие цены
-        await event_bus.publish(Event(
-            type="price_alerts.get_current_prices",
-            data={"user_id": user_id, "symbols": ["BTCUSDT", "ETHUSDT", "BNBUSDT"]},
-            source_module="telegram"
-        ))
-        
-        text = "📊 <b>Текущие цены</b>\n\n🔄 Загружаем актуальные данные..."
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="price_current_prices")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        # Экран загрузки уходит параллельно с запросом данных
+        loading = asyncio.create_task(
+            screen_and_answer(callback, _CURRENT_PRICES_LOADING_SCREEN, _PRICES_LOADING_KB)
+        )
         
-        # Сохраняем контекст
+        # Сохраняем контекст (до запроса - ответ может прийти сразу)
         self._response_cache[user_id] = {
             "type": "current_prices",
-            "message": callback.message
+            "message": callback.message,
+            "loading": loading
         }
+        
+        # Запрашиваем текущие цены
+        try:
+            await self._request_once(
+                user_id,
+                "price_alerts.get_current_prices",
+                {"user_id": user_id, "symbols": ["BTCUSDT", "ETHUSDT", "BNBUSDT"]}
+            )
+        finally:
+            await loading
     
     async def show_statistics(self, callback: types.CallbackQuery):
         """Показ статистики."""
         user_id = callback.from_user.id
         
-        # Запрашиваем статистику
-        await event_bus.publish(Event(
-            type="price_alerts.get_statistics",
-            data={"user_id": user_id},
-            source_module="telegram"
-        ))
-        
-        text = "📈 <b>Статистика</b>\n\n🔄 Собираем данные..."
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="price_statistics")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        # Экран загрузки уходит параллельно с запросом данных
+        loading = asyncio.create_task(
+            screen_and_answer(callback, _STATISTICS_LOADING_SCREEN, _STATISTICS_LOADING_KB)
+        )
         
-        # Сохраняем контекст
+        # Сохраняем контекст (до запроса - ответ может прийти сразу)
         self._response_cache[user_id] = {
             "type": "statistics",
-            "message": callback.message
+            "message": callback.message,
+            "loading": loading
         }
+        
+        # Запрашиваем статистику
+        try:
+            await self._request_once(user_id, "price_alerts.get_statistics", {"user_id": user_id})
+        finally:
+            await loading
     
-    async def activate_preset(self, callback: types.CallbackQuery):
+    async def activate_preset(self, callback: types.CallbackQuery, callback_data: PresetAction):
         """Активация пресета."""
-        preset_id = callback.data.split("_", 1)[1]
+        if self._is_repeated_click(callback):
+            await callback.answer()
+            return
+        
+        preset_id = callback_data.preset_id
+        
+        self._patch_cached_presets(callback.from_user.id, preset_id, True)
         
         await event_bus.publish(Event(
             type="price_alerts.activate_preset",
@@ -535,14 +915,18 @@ class PriceAlertsHandler:
             source_module="telegram"
         ))
         
-        await callback.answer("✅ Пресет активируется...")
-        
-        # Обновляем список пресетов
-        await self.show_user_presets(callback)
+        # Обновляем список пресетов (один ответ на callback)
+        await self.show_user_presets(callback, "✅ Пресет активируется...")
     
-    async def deactivate_preset(self, callback: types.CallbackQuery):
+    async def deactivate_preset(self, callback: types.CallbackQuery, callback_data: PresetAction):
         """Деактивация пресета."""
-        preset_id = callback.data.split("_", 1)[1]
+        if self._is_repeated_click(callback):
+            await callback.answer()
+            return
+        
+        preset_id = callback_data.preset_id
+        
+        self._patch_cached_presets(callback.from_user.id, preset_id, False)
         
         await event_bus.publish(Event(
             type="price_alerts.deactivate_preset",
@@ -550,14 +934,18 @@ class PriceAlertsHandler:
             source_module="telegram"
         ))
         
-        await callback.answer("⏹️ Пресет деактивируется...")
-        
-        # Обновляем список пресетов
-        await self.show_user_presets(callback)
+        # Обновляем список пресетов (один ответ на callback)
+        await self.show_user_presets(callback, "⏹️ Пресет деактивируется...")
     
-    async def delete_preset(self, callback: types.CallbackQuery):
+    async def delete_preset(self, callback: types.CallbackQuery, callback_data: PresetAction):
         """Удаление пресета."""
-        preset_id = callback.data.split("_", 2)[2]
+        if self._is_repeated_click(callback):
+            await callback.answer()
+            return
+        
+        preset_id = callback_data.preset_id
+        
+        self._patch_cached_presets(callback.from_user.id, preset_id, None)
         
         await event_bus.publish(Event(
             type="price_alerts.delete_preset",
@@ -565,88 +953,24 @@ class PriceAlertsHandler:
             source_module="telegram"
         ))
         
-        await callback.answer("🗑️ Пресет удаляется...")
-        
-        # Обновляем список пресетов
-        await self.show_user_presets(callback)
+        # Обновляем список пресетов (один ответ на callback)
+        await self.show_user_presets(callback, "🗑️ Пресет удаляется...")
     
-    async def edit_preset(self, callback: types.CallbackQuery):
+    async def edit_preset(self, callback: types.CallbackQuery, callback_data: PresetAction):
         """Редактирование пресета."""
         await callback.answer("⚙️ Функция редактирования в разработке")
     
     async def show_help(self, callback: types.CallbackQuery):
         """Показ справки."""
-        text = (
-            "ℹ️ <b>Справка по Price Alerts</b>\n\n"
-            
-            "📝 <b>Пресеты:</b>\n"
-            "Группируйте токены по темам или стратегиям\n\n"
-            
-            "📈 <b>Процент изменения:</b>\n"
-            "• 1-2% - много сигналов\n"
-            "• 3-5% - оптимально\n"
-            "• 10%+ - только крупные движения\n\n"
-            
-            "⏰ <b>Таймфреймы:</b>\n"
-            "• 1m/5m - скальпинг\n"
-            "• 15m/1h - свинг-трейдинг\n"
-            "• 4h/1d - позиционная торговля\n\n"
-            
-            "🔔 <b>Уведомления:</b>\n"
-            "Приходят сразу при достижении условий"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="➕ Создать пресет", callback_data="price_create_preset")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _HELP_SCREEN, _CREATE_BACK_KB)
     
     async def show_settings(self, callback: types.CallbackQuery):
         """Показ настроек."""
-        text = (
-            "⚙️ <b>Настройки Price Alerts</b>\n\n"
-            
-            "🔔 <b>Уведомления:</b> Включены\n"
-            "📱 <b>Группировка:</b> Включена\n"
-            "🔊 <b>Звук:</b> Включен\n"
-            "⏰ <b>Интервал по умолчанию:</b> 15m\n"
-            "📈 <b>Процент по умолчанию:</b> 3%\n\n"
-            
-            "💡 Настройки применятся к новым пресетам"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔔 Уведомления", callback_data="settings_notifications")
-        builder.button(text="📱 Группировка", callback_data="settings_grouping")
-        builder.button(text="🔊 Звук", callback_data="settings_sound")
-        builder.button(text="⚙️ Дефолты", callback_data="settings_defaults")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(2, 2, 1)
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _SETTINGS_SCREEN, _SETTINGS_KB)
     
     async def export_data(self, callback: types.CallbackQuery):
         """Экспорт данных."""
-        text = (
-            "📤 <b>Экспорт данных</b>\n\n"
-            
-            "📊 Доступные форматы:\n"
-            "• JSON - все пресеты и настройки\n"
-            "• CSV - статистика алертов\n"
-            "• TXT - список отслеживаемых пар\n\n"
-            
-            "⚠️ Экспорт данных временно недоступен"
-        )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        
-        await callback.message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
-        await callback.answer()
+        await screen_and_answer(callback, _EXPORT_SCREEN, _BACK_KB)
     
     # EVENT HANDLERS
     
@@ -656,15 +980,22 @@ class PriceAlertsHandler:
         user_id = event.data.get("user_id")
         
         if success:
-            logger.info(f"Preset created successfully for user {user_id}")
+            logger.info("Preset created successfully for user %s", user_id)
         else:
-            logger.warning(f"Failed to create preset for user {user_id}")
+            logger.warning("Failed to create preset for user %s", user_id)
+    
+    async def _handle_preset_changed(self, event: Event):
+        """Результат изменения пресета: при ошибке локально исправленный кеш недостоверен."""
+        if not event.data.get("success"):
+            self._invalidate_presets(event.data.get("user_id"))
     
     async def _handle_user_presets_response(self, event: Event):
         """Обработка ответа с пресетами пользователя."""
         user_id = event.data.get("user_id")
         presets = event.data.get("presets", [])
         
+        self._presets_cache[user_id] = (time.monotonic(), presets)
+        
         if user_id not in self._response_cache:
             return
         
@@ -673,11 +1004,10 @@ class PriceAlertsHandler:
         if context["type"] == "user_presets":
             await self._update_presets_display(context["message"], presets)
         elif context["type"] == "main_menu":
-            await self._update_main_menu_with_presets(context["message"], presets, user_id)
+            await self._update_main_menu_with_presets(context["message"], presets)
         
         # Очищаем кеш
-        if user_id in self._response_cache:
-            del self._response_cache[user_id]
+        self._response_cache.pop(user_id, None)
     
     async def _update_presets_display(self, message: types.Message, presets: list):
         """Обновление отображения пресетов."""
@@ -689,90 +1019,73 @@ class PriceAlertsHandler:
                 "получать уведомления о движениях цен!"
             )
             
-            builder = InlineKeyboardBuilder()
-            builder.button(text="➕ Создать первый пресет", callback_data="price_create_preset")
-            builder.button(text="ℹ️ Помощь", callback_data="price_help")
-            builder.button(text="◀️ Назад", callback_data="price_alerts")
-            builder.adjust(1)
+            markup = _NO_PRESETS_KB
         else:
-            text = f"📋 <b>Мои пресеты ({len(presets)})</b>\n\n"
+            parts = [f"📋 <b>Мои пресеты ({len(presets)})</b>\n\n"]
             
-            builder = InlineKeyboardBuilder()
+            rows = []
             
             for i, preset in enumerate(presets, 1):
-                status = "🟢" if preset.get('is_active', False) else "🔴"
+                status, action_text, action = _PRESET_STATE[bool(preset.get('is_active', False))]
                 
-                text += (
+                parts.append(
                     f"{status} <b>{preset['name']}</b>\n"
                     f"   📊 {preset['symbols_count']} пар\n"
                     f"   ⏰ {preset['interval']}\n"
                     f"   📈 {preset['percent_threshold']}%\n"
                 )
                 
-                if preset.get('alerts_count', 0) > 0:
-                    text += f"   🔔 {preset['alerts_count']} алертов\n"
+                alerts_count = preset.get('alerts_count', 0)
+                if alerts_count > 0:
+                    parts.append(f"   🔔 {alerts_count} алертов\n")
                 
-                text += "\n"
+                parts.append("\n")
                 
-                # Кнопки управления
-                preset_id = preset['id']
-                if preset.get('is_active', False):
-                    builder.button(text=f"⏸️ Приостановить #{i}", callback_data=f"deactivate_{preset_id}")
-                else:
-                    builder.button(text=f"▶️ Активировать #{i}", callback_data=f"activate_{preset_id}")
-                
-                builder.button(text=f"🗑️ Удалить #{i}", callback_data=f"delete_preset_{preset_id}")
+                # Кнопки управления - одна строка на пресет
+                preset_id = str(preset['id'])
+                rows.append([
+                    InlineKeyboardButton(
+                        text=f"{action_text} #{i}",
+                        callback_data=PresetAction(action=action, preset_id=preset_id).pack()
+                    ),
+                    InlineKeyboardButton(
+                        text=f"🗑️ Удалить #{i}",
+                        callback_data=PresetAction(action="delete", preset_id=preset_id).pack()
+                    ),
+                ])
             
-            builder.button(text="➕ Создать пресет", callback_data="price_create_preset")
-            builder.button(text="🚀 Запустить все", callback_data="price_start_monitoring")
-            builder.button(text="◀️ Назад", callback_data="price_alerts")
-            builder.adjust(2)
+            rows.extend(_PRESETS_FOOTER_ROWS)
+            markup = InlineKeyboardMarkup(inline_keyboard=rows)
+            text = "".join(parts)
         
         try:
-            await message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await edit_text(message, text, markup)
         except Exception as e:
-            logger.error(f"Error updating presets display: {e}")
+            logger.error("Error updating presets display: %s", e)
     
-    async def _update_main_menu_with_presets(self, message: types.Message, presets: list, user_id: int):
+    async def _update_main_menu_with_presets(self, message: types.Message, presets: list):
         """Обновление главного меню с данными о пресетах."""
-        active_presets = [p for p in presets if p.get('is_active', False)]
-        total_pairs = sum(p.get('symbols_count', 0) for p in active_presets)
-        
-        text = (
-            "📈 <b>Price Alerts</b>\n\n"
-            "🚀 <b>Система мониторинга цен в реальном времени</b>\n\n"
-            
-            f"📊 <b>Ваша статистика:</b>\n"
-            f"• Пресетов создано: {len(presets)}\n"
-            f"• Активных пресетов: {len(active_presets)}\n"
-            f"• Отслеживаемых пар: {total_pairs}\n\n"
-            
-            "🎯 <b>Статус мониторинга:</b> " + 
-            ("🟢 Активен" if active_presets else "🔴 Остановлен") + "\n\n"
-            
-            "⚡ Выберите действие:"
+        # Один проход без промежуточного списка активных пресетов
+        active_count = 0
+        total_pairs = 0
+        for preset in presets:
+            if preset.get('is_active', False):
+                active_count += 1
+                total_pairs += preset.get('symbols_count', 0)
+        
+        text = _MENU_STATS_TPL.format(
+            total=len(presets),
+            active=active_count,
+            pairs=total_pairs,
+            status="🟢 Активен" if active_count else "🔴 Остановлен"
         )
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="➕ Создать пресет", callback_data="price_create_preset")
-        builder.button(text="📋 Мои пресеты", callback_data="price_my_presets")
-        
-        if active_presets:
-            builder.button(text="⏹️ Остановить мониторинг", callback_data="price_stop_monitoring")
-        else:
-            builder.button(text="🚀 Запустить мониторинг", callback_data="price_start_monitoring")
-        
-        builder.button(text="📊 Текущие цены", callback_data="price_current_prices")
-        builder.button(text="📈 Статистика", callback_data="price_statistics")
-        builder.button(text="⚙️ Настройки", callback_data="price_settings")
-        builder.button(text="ℹ️ Помощь", callback_data="price_help")
-        builder.button(text="◀️ Назад", callback_data="main_menu")
-        builder.adjust(2, 1, 2, 2, 1)
+        markup = _MENU_MONITORING_KB if active_count else _MENU_IDLE_KB
         
         try:
-            await message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await edit_text(message, text, markup)
         except Exception as e:
-            logger.error(f"Error updating main menu: {e}")
+            logger.error("Error updating main menu: %s", e)
     
     async def _handle_prices_response(self, event: Event):
         """Обработка ответа с текущими ценами."""
@@ -788,6 +1101,11 @@ class PriceAlertsHandler:
         
         message = context["message"]
         
+        # Данные рисуем только поверх уже показанного экрана загрузки
+        loading = context.get("loading")
+        if loading is not None:
+            await asyncio.wait((loading,))
+        
         if not prices:
             text = (
                 "📊 <b>Текущие цены</b>\n\n"
@@ -795,32 +1113,28 @@ class PriceAlertsHandler:
                 "Попробуйте обновить позже"
             )
         else:
-            text = "📊 <b>Текущие цены</b>\n\n"
+            parts = ["📊 <b>Текущие цены</b>\n\n"]
             
             for symbol, price_data in prices.items():
-                change_icon = "🟢" if price_data['change_percent_24h'] > 0 else "🔴"
+                change_percent = price_data['change_percent_24h']
+                change_icon = "🟢" if change_percent > 0 else "🔴"
                 
-                text += (
+                parts.append(
                     f"{change_icon} <b>{symbol}</b>\n"
                     f"   💰 ${price_data['price']:.4f}\n"
-                    f"   📈 {price_data['change_percent_24h']:+.2f}%\n"
+                    f"   📈 {change_percent:+.2f}%\n"
                     f"   📊 Volume: ${price_data['volume_24h']:,.0f}\n\n"
                 )
-        
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="price_current_prices")
-        builder.button(text="➕ Создать алерт", callback_data="price_create_preset")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(2, 1)
+            
+            text = "".join(parts)
         
         try:
-            await message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await edit_text(message, text, _PRICES_KB)
         except Exception as e:
-            logger.error(f"Error updating prices display: {e}")
+            logger.error("Error updating prices display: %s", e)
         
         # Очищаем кеш
-        if user_id in self._response_cache:
-            del self._response_cache[user_id]
+        self._response_cache.pop(user_id, None)
     
     async def _handle_statistics_response(self, event: Event):
         """Обработка ответа со статистикой."""
@@ -836,6 +1150,11 @@ class PriceAlertsHandler:
         
         message = context["message"]
         
+        # Данные рисуем только поверх уже показанного экрана загрузки
+        loading = context.get("loading")
+        if loading is not None:
+            await asyncio.wait((loading,))
+        
         text = (
             "📈 <b>Статистика Price Alerts</b>\n\n"
             
@@ -859,17 +1178,10 @@ class PriceAlertsHandler:
         if statistics.get('avg_response_time', 0) > 0:
             text += f"• Среднее время ответа: {statistics['avg_response_time']:.2f}с\n"
         
-        builder = InlineKeyboardBuilder()
-        builder.button(text="🔄 Обновить", callback_data="price_statistics")
-        builder.button(text="📊 Текущие цены", callback_data="price_current_prices")
-        builder.button(text="◀️ Назад", callback_data="price_alerts")
-        builder.adjust(2, 1)
-        
         try:
-            await message.edit_text(text, reply_markup=builder.as_markup(), parse_mode="HTML")
+            await edit_text(message, text, _STATISTICS_KB)
         except Exception as e:
-            logger.error(f"Error updating statistics display: {e}")
+            logger.error("Error updating statistics display: %s", e)
         
         # Очищаем кеш
-        if user_id in self._response_cache:
-            del self._response_cache[user_id]
\ No newline at end of file
+        self._response_cache.pop(user_id, None)
\ No newline at end of file
@@ -1,9 +1,10 @@
 # modules/telegram/middleware/logging_middleware.py
 """Middleware для логирования действий пользователей."""
 
+import asyncio
 from typing import Callable, Dict, Any, Awaitable
 from aiogram import BaseMiddleware
-from aiogram.types import TelegramObject, Update
+from aiogram.types import TelegramObject, Update, Message, CallbackQuery
 
 from shared.events import event_bus, Event, USER_COMMAND_RECEIVED
 
@@ -11,6 +12,28 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Очередь событий аналитики: публикуются фоновой задачей, не задерживая handler
+_log_queue: asyncio.Queue = asyncio.Queue(maxsize=10000)
+
+
+def enqueue_event(event: Event) -> None:
+    """Постановка события в очередь публикации без ожидания."""
+    try:
+        _log_queue.put_nowait(event)
+    except asyncio.QueueFull:
+        # Аналитика не критична - при переполнении событие отбрасывается
+        pass
+
+
+async def publish_queued_events() -> None:
+    """Фоновая публикация событий из очереди в event bus."""
+    while True:
+        event = await _log_queue.get()
+        try:
+            await event_bus.publish(event)
+        except Exception as e:
+            logger.error("Error publishing queued event %s: %s", event.type, e)
+
 
 class LoggingMiddleware(BaseMiddleware):
     """Middleware для логирования и аналитики."""
@@ -23,44 +46,62 @@ class LoggingMiddleware(BaseMiddleware):
     ) -> Any:
         """Обработка события."""
         
+        # Middleware висит на Update - достаем сообщение или callback
+        if isinstance(event, Update):
+            source = event.message or event.callback_query
+        else:
+            source = event
+        
+        user = getattr(source, 'from_user', None)
+        
+        # Без подписчиков аналитики и INFO-логов данные события не собираем
+        track = event_bus.has_subscribers(USER_COMMAND_RECEIVED)
+        log_info = logger.isEnabledFor(logging.INFO)
+        
         # Логируем действие пользователя
-        if hasattr(event, 'from_user') and event.from_user:
-            user_id = event.from_user.id
-            username = event.from_user.username
+        if user and (track or log_info):
+            user_id = user.id
+            username = user.username
             
             # Определяем тип события
             event_type = "unknown"
             event_data = {"user_id": user_id, "username": username}
             
-            if hasattr(event, 'text') and event.text:
-                event_type = "message"
-                event_data["text"] = event.text[:100]  # Первые 100 символов
-            elif hasattr(event, 'data') and event.data:
-                event_type = "callback"
-                event_data["callback_data"] = event.data
+            if isinstance(source, Message):
+                text = source.text
+                if text:
+                    event_type = "message"
+                    event_data["text"] = text[:100]  # Первые 100 символов
+            elif isinstance(source, CallbackQuery):
+                callback_data = source.data
+                if callback_data:
+                    event_type = "callback"
+                    event_data["callback_data"] = callback_data
             
             # Публикуем событие
-            await event_bus.publish(Event(
-                type=USER_COMMAND_RECEIVED,
-                data=event_data,
-                source_module="telegram"  # ИСПРАВЛЕНО: используем source_module вместо module
-            ))
+            if track:
+                enqueue_event(Event(
+                    type=USER_COMMAND_RECEIVED,
+                    data=event_data,
+                    source_module="telegram"  # ИСПРАВЛЕНО: используем source_module вместо module
+                ))
             
-            logger.info(f"User {user_id} ({username}) - {event_type}: {event_data}")
+            if log_info:
+                logger.info("User %s (%s) - %s: %s", user_id, username, event_type, event_data)
         
         # Вызываем основной обработчик
         try:
             return await handler(event, data)
         except Exception as e:
-            logger.error(f"Error in handler: {e}")
+            logger.error("Error in handler: %s", e)
             
             # Публикуем событие об ошибке
-            await event_bus.publish(Event(
+            enqueue_event(Event(
                 type="system.error",
                 data={
                     "error": str(e),
-                    "handler": handler.__name__,
-                    "user_id": getattr(event, 'from_user', {}).get('id') if hasattr(event, 'from_user') else None
+                    "handler": getattr(handler, '__name__', type(handler).__name__),
+                    "user_id": user.id if user else None
                 },
                 source_module="telegram"  # ИСПРАВЛЕНО: используем source_module вместо module
             ))
@@ -2,40 +2,178 @@
 """Сервис Telegram с встроенным диспетчером алертов."""
 
 import asyncio
-from typing import Dict, Any, Optional
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from aiogram import Bot, Dispatcher
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.exceptions import (
+    TelegramRetryAfter, TelegramNetworkError, TelegramBadRequest, TelegramForbiddenError
+)
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from shared.events import event_bus, Event, MESSAGE_SENT, USER_COMMAND_RECEIVED
+from shared.events import (
+    event_bus, Event, MESSAGE_SENT,
+    PRICE_ALERT_TRIGGERED, GAS_ALERT_TRIGGERED, WHALE_ALERT_TRIGGERED, WALLET_ALERT_TRIGGERED
+)
 from .handlers.main_handler import MainHandler
-from .middleware.logging_middleware import LoggingMiddleware
+from .middleware.logging_middleware import LoggingMiddleware, enqueue_event, publish_queued_events
 from .alert_dispatcher import AlertDispatcher
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Тип события алерта -> (шаблон сообщения, тип алерта для диспетчера)
+_ALERT_ROUTES = {
+    PRICE_ALERT_TRIGGERED: ("📈 %s", "price"),
+    GAS_ALERT_TRIGGERED: ("⛽ %s", "gas"),
+    WHALE_ALERT_TRIGGERED: ("🐋 %s", "whale"),
+    WALLET_ALERT_TRIGGERED: ("👛 %s", "wallet"),
+}
+
+# Иконки уведомлений по типу
+_ICONS = {
+    "info": "ℹ️",
+    "success": "✅",
+    "warning": "⚠️",
+    "error": "❌",
+    "price": "📈",
+    "gas": "⛽",
+    "whale": "🐋",
+    "wallet": "👛"
+}
+_DEFAULT_ICON = "🔔"
+
+# Сколько раз повторяем отправку после flood control (RetryAfter)
+_SEND_ATTEMPTS = 3
+
+# Лимит длины одного сообщения Telegram
+_MAX_MESSAGE_LENGTH = 4096
+
+# Открывающий или закрывающий HTML-тег: группа 1 - "/" у закрывающего, группа 2 - имя
+_HTML_TAG_RE = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^>]*>")
+
+def _find_cut(text: str, limit: int) -> int:
+    """Позиция разреза не дальше limit: по абзацу, по строке, иначе вне тега и HTML-сущности."""
+    cut = text.rfind("\n\n", 0, limit)
+    if cut <= 0:
+        cut = text.rfind("\n", 0, limit)
+    if cut > 0:
+        return cut
+    
+    # Жесткий разрез: не попадаем внутрь <тега> или &сущности; - Telegram отверг бы такую часть
+    cut = limit
+    tag_start = text.rfind("<", 0, cut)
+    if tag_start > text.rfind(">", 0, cut):
+        cut = tag_start
+    entity_start = text.rfind("&", 0, cut)
+    if entity_start > text.rfind(";", 0, cut):
+        cut = entity_start
+    return cut if cut > 0 else limit
+
+def _open_tags(html: str) -> List[Tuple[str, str]]:
+    """Незакрытые теги в html: (имя, исходный открывающий тег) от внешнего к внутреннему."""
+    stack: List[Tuple[str, str]] = []
+    for match in _HTML_TAG_RE.finditer(html):
+        name = match.group(2).lower()
+        if not match.group(1):
+            stack.append((name, match.group(0)))
+            continue
+        for i in range(len(stack) - 1, -1, -1):
+            if stack[i][0] == name:
+                del stack[i:]
+                break
+    return stack
+
+def _split_message(text: str, limit: int = _MAX_MESSAGE_LENGTH) -> List[str]:
+    """Разбиение длинного HTML-текста на части не длиннее limit: по абзацам, затем по строкам.
+    
+    Теги, открытые на границе, закрываются в конце части и открываются заново в следующей.
+    """
+    parts = []
+    
+    while len(text) > limit:
+        budget = limit
+        for _ in range(2):
+            cut = _find_cut(text, budget)
+            open_tags = _open_tags(text[:cut])
+            closing = "".join(f"</{name}>" for name, _ in reversed(open_tags))
+            if cut + len(closing) <= limit:
+                break
+            # Закрывающие теги не влезли - режем раньше на их длину
+            budget = limit - len(closing)
+        
+        parts.append(text[:cut] + closing)
+        text = "".join(tag for _, tag in open_tags) + text[cut:].lstrip("\n")
+    
+    if text:
+        parts.append(text)
+    return parts
+
+class PooledAiohttpSession(AiohttpSession):
+    """Сессия aiohttp с keep-alive пулом соединений к Telegram API.
+    
+    Параметры пула дописываются в _connector_init, из которого AiohttpSession.create_session
+    строит коннектор - SSL-контекст certifi, прокси и заголовки aiogram сохраняются.
+    """
+    
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 50,
+        keepalive_timeout: float = 75,
+        ttl_dns_cache: int = 3600,
+        **kwargs
+    ):
+        super().__init__(limit=limit, **kwargs)
+        self._connector_init.update(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=ttl_dns_cache,
+            enable_cleanup_closed=True
+        )
+
 class TelegramService:
     """Сервис для управления Telegram ботом с диспетчером алертов."""
     
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, check_webhook: bool = True):
         self.bot_token = bot_token
+        self.check_webhook = check_webhook
         self.bot: Optional[Bot] = None
         self.dp: Optional[Dispatcher] = None
         self.running = False
+        self._event_publisher_task: Optional[asyncio.Task] = None
         
         # Handlers
         self.main_handler = MainHandler()
         self.price_alerts_handler = None
+        self._handlers_count = 1  # main_handler
         
         # Alert dispatcher
         self.alert_dispatcher = AlertDispatcher(self)
         
-        # Подписываемся на события алертов
-        event_bus.subscribe("price_alert.triggered", self._handle_price_alert)
+        # Ограничение параллельных отправок (глобально и по чату)
+        self._send_semaphore = asyncio.Semaphore(25)
+        self._chat_locks: "OrderedDict[int, asyncio.Lock]" = OrderedDict()
+        self._chat_locks_max = 10000
+        self._chat_next_allowed: Dict[int, float] = {}
         
-        # Подписываемся на системные события
-        event_bus.subscribe("system.error", self._handle_system_error)
+        # Недавно отправленные сообщения для отсечения дубликатов
+        self._recent_messages: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+        self._dedup_ttl = 60
+        self._dedup_max = 5000
+        
+        # Агрегированная статистика отправок (дешевле отдельного события на каждое сообщение)
+        self._sent_stats = {"success": 0, "failed": 0, "duplicates": 0, "chars": 0}
+        
+        # Подписываемся на события алертов и системные события одним вызовом
+        subscriptions = dict.fromkeys(_ALERT_ROUTES, self._handle_alert)
+        subscriptions["system.error"] = self._handle_system_error
+        event_bus.subscribe_many(subscriptions)
     
     def set_services(self, **services):
         """Инъекция сервисов в handlers."""
@@ -47,6 +185,8 @@ class TelegramService:
             from .handlers.price_alerts_handler import PriceAlertsHandler
             self.price_alerts_handler = PriceAlertsHandler()
             logger.info("✅ Price Alerts handlers initialized")
+        
+        self._handlers_count = 1 + (self.price_alerts_handler is not None)
     
     async def start(self) -> None:
         """Запуск Telegram сервиса."""
@@ -55,38 +195,45 @@ class TelegramService:
         
         try:
             # Создаем бота и диспетчер
-            self.bot = Bot(token=self.bot_token)
+            self.bot = Bot(
+                token=self.bot_token,
+                session=PooledAiohttpSession(),
+                default=DefaultBotProperties(parse_mode="HTML")
+            )
             self.dp = Dispatcher(storage=MemoryStorage())
             
-            # Устанавливаем middleware
-            self.dp.message.middleware(LoggingMiddleware())
-            self.dp.callback_query.middleware(LoggingMiddleware())
+            # Устанавливаем middleware (один экземпляр на уровне Update)
+            self.dp.update.outer_middleware(LoggingMiddleware())
             
             # Регистрируем обработчики
             await self._setup_handlers()
             
-            # Удаляем webhook если есть
-            await self._delete_webhook()
+            # Удаляем webhook если есть (в режиме чистого polling пропускаем два API-запроса)
+            if self.check_webhook:
+                await self._delete_webhook()
             
             # Запускаем alert dispatcher
             await self.alert_dispatcher.start()
             
+            # Фоновая публикация событий аналитики
+            self._event_publisher_task = asyncio.create_task(publish_queued_events())
+            
             self.running = True
             
             logger.info("✅ Telegram service initialized")
             
-            # Публикуем событие готовности
-            await event_bus.publish(Event(
+            # Публикуем событие готовности, не задерживая старт polling
+            enqueue_event(Event(
                 type="telegram.service_ready",
-                data={"handlers_count": 1},
+                data={"handlers_count": self._handlers_count},
                 source_module="telegram"
             ))
             
-            # Запускаем polling
+            # Запускаем polling (aiogram по умолчанию обрабатывает каждый апдейт отдельной задачей)
             await self.dp.start_polling(self.bot)
             
         except Exception as e:
-            logger.error(f"❌ Failed to start Telegram service: {e}")
+            logger.error("❌ Failed to start Telegram service: %s", e)
             raise
     
     async def stop(self) -> None:
@@ -97,6 +244,10 @@ class TelegramService:
             # Останавливаем alert dispatcher
             await self.alert_dispatcher.stop()
             
+            if self._event_publisher_task:
+                self._event_publisher_task.cancel()
+                self._event_publisher_task = None
+            
             if self.dp:
                 await self.dp.stop_polling()
             
@@ -106,28 +257,22 @@ class TelegramService:
             logger.info("📱 Telegram service stopped")
             
         except Exception as e:
-            logger.error(f"Error stopping Telegram service: {e}")
+            logger.error("Error stopping Telegram service: %s", e)
     
     async def _setup_handlers(self) -> None:
         """Настройка обработчиков команд."""
         try:
-            handlers_registered = 0
-            
-            # Регистрируем основной обработчик
+            # Регистрация синхронная и быстрая: aiogram Router не потокобезопасен,
+            # поэтому без to_thread - один проход и одна строка в лог
             self.main_handler.register(self.dp)
-            handlers_registered += 1
-            logger.info("✅ Main handlers registered")
             
-            # Регистрируем Price Alerts handlers если доступны
             if self.price_alerts_handler:
                 self.price_alerts_handler.register_handlers(self.dp)
-                handlers_registered += 1
-                logger.info("✅ Price Alerts handlers registered")
             
-            logger.info(f"✅ Total handlers registered: {handlers_registered}")
+            logger.info("✅ Total handlers registered: %s", self._handlers_count)
             
         except Exception as e:
-            logger.error(f"❌ Error setting up handlers: {e}")
+            logger.error("❌ Error setting up handlers: %s", e)
             raise
     
     async def _delete_webhook(self) -> None:
@@ -135,25 +280,33 @@ class TelegramService:
         try:
             webhook_info = await self.bot.get_webhook_info()
             if webhook_info.url:
-                logger.info(f"Deleting webhook: {webhook_info.url}")
+                logger.info("Deleting webhook: %s", webhook_info.url)
                 await self.bot.delete_webhook(drop_pending_updates=True)
         except Exception as e:
-            logger.warning(f"Error deleting webhook: {e}")
+            logger.warning("Error deleting webhook: %s", e)
     
     # EVENT HANDLERS
     
-    async def _handle_price_alert(self, event: Event) -> None:
-        """Обработка ценового алерта."""
+    async def _handle_alert(self, event: Event) -> None:
+        """Обработка алерта любого модуля."""
         try:
-            user_id = event.data.get("user_id")
-            message = event.data.get("message")
+            template, alert_type = _ALERT_ROUTES[event.type]
             
-            if user_id and message:
-                await self.alert_dispatcher.dispatch_alert(user_id, f"📈 {message}", "price")
-                logger.debug(f"Dispatched price alert to user {user_id}")
+            data = event.data
+            user_id = data.get("user_id")
+            message = data.get("message")
+            recipients = data.get("user_ids") or ([user_id] if user_id else [])
+            
+            if recipients and message:
+                text = template % message
+                # dispatch_alert только ставит алерт в очередь и не блокируется - задачи не нужны
+                for uid in recipients:
+                    await self.alert_dispatcher.dispatch_alert(uid, text, alert_type)
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Dispatched %s alert to %s users", alert_type, len(recipients))
                 
         except Exception as e:
-            logger.error(f"Error handling price alert: {e}")
+            logger.error("Error handling %s: %s", event.type, e)
     
     async def _handle_system_error(self, event: Event) -> None:
         """Обработка системных ошибок."""
@@ -162,83 +315,157 @@ class TelegramService:
             module = event.source_module
             
             # Можно отправить уведомление администратору
-            logger.error(f"System error in {module}: {error}")
+            logger.error("System error in %s: %s", module, error)
             
         except Exception as e:
-            logger.error(f"Error handling system error: {e}")
+            logger.error("Error handling system error: %s", e)
     
     async def send_message(self, user_id: int, text: str, **kwargs) -> bool:
         """Отправка сообщения пользователю."""
+        if not self.bot:
+            logger.error("Bot not initialized")
+            return False
+        
+        # Длинный текст отправляем частями вместо обрезки (короткий - без копирования)
+        parts = (text,) if len(text) <= _MAX_MESSAGE_LENGTH else _split_message(text)
+        sent_parts = 0
+        
         try:
-            if not self.bot:
-                logger.error("Bot not initialized")
-                return False
+            # Сначала лок чата: очередь сообщений одному чату не занимает глобальные слоты отправки.
+            # Под этим же локом проверяются дубликаты - параллельная копия увидит уже отправленное
+            async with self._get_chat_lock(user_id):
+                for part in parts:
+                    # Недавно доставленную часть (в том числе до сбоя прошлой попытки) не повторяем
+                    dedup_key = (user_id, hash(part))
+                    if self._is_recent(dedup_key):
+                        continue
+                    
+                    await self._send_with_retry(user_id, part, **kwargs)
+                    
+                    # Регистрируем только после успешной отправки: любая ошибка оставляет повтор возможным
+                    self._remember_sent(dedup_key)
+                    sent_parts += 1
+        except (TelegramRetryAfter, TelegramNetworkError, TelegramBadRequest, TelegramForbiddenError) as e:
+            logger.error("Error sending message to %s: %s", user_id, e)
             
-            # Ограничиваем длину сообщения
-            if len(text) > 4096:
-                text = text[:4093] + "..."
+            self._sent_stats["failed"] += 1
             
-            await self.bot.send_message(chat_id=user_id, text=text, **kwargs)
-            
-            # Публикуем событие успешной отправки
-            await event_bus.publish(Event(
-                type=MESSAGE_SENT,
-                data={
-                    "user_id": user_id,
-                    "text_length": len(text),
-                    "success": True
-                },
-                source_module="telegram"
-            ))
+            # Публикуем событие неудачной отправки
+            if event_bus.has_subscribers(MESSAGE_SENT):
+                enqueue_event(Event(
+                    type=MESSAGE_SENT,
+                    data={
+                        "user_id": user_id,
+                        "text_length": len(text),
+                        "success": False,
+                        "error": e.message
+                    },
+                    source_module="telegram"
+                ))
             
+            return False
+        
+        stats = self._sent_stats
+        
+        # Точный дубликат недавнего сообщения повторно не отправлялся
+        if not sent_parts:
+            stats["duplicates"] += 1
             return True
-            
-        except Exception as e:
-            error_message = str(e)
-            logger.error(f"Error sending message to {user_id}: {error_message}")
-            
-            # Публикуем событие неудачной отправки
-            await event_bus.publish(Event(
+        
+        stats["success"] += 1
+        stats["chars"] += len(text)
+        
+        # Публикуем событие успешной отправки (телеметрия - только при наличии подписчиков)
+        if event_bus.has_subscribers(MESSAGE_SENT):
+            enqueue_event(Event(
                 type=MESSAGE_SENT,
                 data={
                     "user_id": user_id,
                     "text_length": len(text),
-                    "success": False,
-                    "error": error_message
+                    "success": True
                 },
                 source_module="telegram"
             ))
+        
+        return True
+    
+    async def _send_with_retry(self, user_id: int, text: str, **kwargs) -> None:
+        """Отправка с ожиданием retry_after при срабатывании flood control (вызывается под локом чата)."""
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(1, _SEND_ATTEMPTS + 1):
+            # Чат под flood control - ждем, не тратя запрос, который вернет 429.
+            # Ожидание идет вне семафора: слот нужен только на сам вызов API
+            wait = self._chat_next_allowed.get(user_id, 0) - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
             
-            return False
+            try:
+                async with self._send_semaphore:
+                    await self.bot.send_message(chat_id=user_id, text=text, **kwargs)
+                self._chat_next_allowed.pop(user_id, None)
+                return
+            except TelegramRetryAfter as e:
+                self._chat_next_allowed[user_id] = loop.time() + e.retry_after
+                if attempt == _SEND_ATTEMPTS:
+                    raise
+                logger.warning("Flood control for %s, retry in %ss", user_id, e.retry_after)
+    
+    def _is_recent(self, key: Tuple[int, int]) -> bool:
+        """Проверка сообщения по TTL-кешу отправленных."""
+        now = time.time()
+        recent = self._recent_messages
+        
+        # Записи упорядочены по времени - удаляем истекшие с головы
+        while recent:
+            sent_at = next(iter(recent.values()))
+            if now - sent_at < self._dedup_ttl:
+                break
+            recent.popitem(last=False)
+        
+        return key in recent
+    
+    def _remember_sent(self, key: Tuple[int, int]) -> None:
+        """Регистрация успешно отправленного сообщения в TTL-кеше."""
+        recent = self._recent_messages
+        recent[key] = time.time()
+        recent.move_to_end(key)
+        if len(recent) > self._dedup_max:
+            recent.popitem(last=False)
+    
+    def _get_chat_lock(self, user_id: int) -> asyncio.Lock:
+        """Лок чата: сообщения одному пользователю уходят последовательно."""
+        locks = self._chat_locks
+        lock = locks.get(user_id)
+        
+        if lock is not None:
+            locks.move_to_end(user_id)
+            return lock
+        
+        lock = locks[user_id] = asyncio.Lock()
+        
+        # LRU: вытесняем самый старый лок, если он сейчас не занят
+        if len(locks) > self._chat_locks_max:
+            oldest_id, oldest_lock = next(iter(locks.items()))
+            if not oldest_lock.locked():
+                del locks[oldest_id]
+                self._chat_next_allowed.pop(oldest_id, None)
+        
+        return lock
     
     async def send_notification(self, user_id: int, title: str, message: str, alert_type: str = "info") -> bool:
         """Отправка форматированного уведомления."""
-        icons = {
-            "info": "ℹ️",
-            "success": "✅",
-            "warning": "⚠️",
-            "error": "❌",
-            "price": "📈",
-            "gas": "⛽",
-            "whale": "🐋",
-            "wallet": "👛"
-        }
-        
-        icon = icons.get(alert_type, "🔔")
-        formatted_text = f"{icon} <b>{title}</b>\n\n{message}"
-        
-        return await self.send_message(user_id, formatted_text, parse_mode="HTML")
+        formatted_text = f"{_ICONS.get(alert_type, _DEFAULT_ICON)} <b>{title}</b>\n\n{message}"
+        
+        return await self.send_message(user_id, formatted_text)
     
     def get_stats(self) -> Dict[str, Any]:
         """Получение статистики сервиса."""
-        handlers_count = 1  # main_handler
-        if self.price_alerts_handler:
-            handlers_count += 1
-            
         return {
             "running": self.running,
             "bot_initialized": self.bot is not None,
             "dispatcher_initialized": self.dp is not None,
-            "handlers_registered": handlers_count,
+            "handlers_registered": self._handlers_count,
+            "messages": self._sent_stats.copy(),
             "alert_dispatcher_stats": self.alert_dispatcher.get_stats()
         }
\ No newline at end of file
@@ -81,7 +81,7 @@ class TokenManager:
             async with aiohttp.ClientSession() as session:
                 async with session.get(self.api_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = orjson.loads(await response.read())
                         
                         # Фильтруем USDT пары
                         usdt_pairs = [
@@ -1,7 +1,7 @@
 # core/events/__init__.py
 """Инициализация модуля событий."""
 
-from .bus import EventBus, Event
+from .bus import EventBus, Event, AlertPayload
 
 # Глобальная шина событий
 event_bus = EventBus()
@@ -33,6 +33,7 @@ APPLICATION_STOPPED = "system.application_stopped"
 __all__ = [
     'EventBus', 
     'Event', 
+    'AlertPayload',
     'event_bus',
     'PRICE_ALERT_TRIGGERED',
     'PRICE_DATA_UPDATED',
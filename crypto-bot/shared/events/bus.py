@@ -3,7 +3,7 @@
 
 import asyncio
 import time
-from typing import Dict, List, Callable, Any
+from typing import Dict, List, Callable, Any, NamedTuple, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 from collections import defaultdict, deque
@@ -11,9 +11,15 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+class AlertPayload(NamedTuple):
+    """Данные алерта для отправки пользователю (в Event.data кладется как dict через _asdict())."""
+    user_id: int
+    message: str
+    details: Optional[Dict[str, Any]] = None
+
+@dataclass(slots=True)
 class Event:
-    """Класс события."""
+    """Класс события (со __slots__ - без __dict__ на каждый экземпляр)."""
     type: str
     data: Dict[str, Any]
     timestamp: datetime = field(default_factory=datetime.utcnow)
@@ -24,6 +30,8 @@ class EventBus:
     
     def __init__(self):
         self._subscribers: Dict[str, List[Callable]] = defaultdict(list)
+        # Готовые кортежи обработчиков для publish, пересобираются при (от)подписке
+        self._dispatch: Dict[str, Tuple[Callable, ...]] = {}
         self._event_history: deque = deque(maxlen=1000)
         self._running = False
     
@@ -42,14 +50,35 @@ class EventBus:
     def subscribe(self, event_type: str, handler: Callable) -> None:
         """Подписка на тип события."""
         self._subscribers[event_type].append(handler)
-        logger.debug(f"Subscribed to {event_type}")
+        self._rebuild_dispatch(event_type)
+        logger.debug("Subscribed to %s", event_type)
+    
+    def subscribe_many(self, handlers: Dict[str, Callable]) -> None:
+        """Подписка сразу на несколько типов событий."""
+        for event_type, handler in handlers.items():
+            self._subscribers[event_type].append(handler)
+            self._rebuild_dispatch(event_type)
+        logger.debug("Subscribed to %s event types", len(handlers))
     
     def unsubscribe(self, event_type: str, handler: Callable) -> None:
         """Отписка от события."""
         try:
             self._subscribers[event_type].remove(handler)
         except ValueError:
-            pass
+            return
+        self._rebuild_dispatch(event_type)
+    
+    def _rebuild_dispatch(self, event_type: str) -> None:
+        """Обновление кешированного кортежа обработчиков типа события."""
+        handlers = self._subscribers.get(event_type)
+        if handlers:
+            self._dispatch[event_type] = tuple(handlers)
+        else:
+            self._dispatch.pop(event_type, None)
+    
+    def has_subscribers(self, event_type: str) -> bool:
+        """Есть ли обработчики для типа события."""
+        return event_type in self._dispatch
     
     async def publish(self, event: Event) -> bool:
         """Публикация события."""
@@ -67,7 +96,7 @@ class EventBus:
             })
             
             # Получаем обработчики
-            handlers = self._subscribers.get(event.type, [])
+            handlers = self._dispatch.get(event.type, ())
             
             if not handlers:
                 return False
@@ -89,7 +118,7 @@ class EventBus:
             return success_count > 0
             
         except Exception as e:
-            logger.error(f"Error publishing event {event.type}: {e}")
+            logger.error("Error publishing event %s: %s", event.type, e)
             return False
     
     async def _safe_call_handler(self, handler: Callable, event: Event) -> Any:
@@ -100,7 +129,7 @@ class EventBus:
             else:
                 return handler(event)
         except Exception as e:
-            logger.error(f"Handler {handler.__name__} failed: {e}")
+            logger.error("Handler %s failed: %s", handler.__name__, e)
             return None
     
     def get_stats(self) -> Dict[str, Any]:
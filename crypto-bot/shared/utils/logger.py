@@ -23,6 +23,13 @@ class ModularFormatter(logging.Formatter):
             'CRITICAL': '\033[35m',  # Magenta
             'RESET': '\033[0m'       # Reset
         }
+        
+        # Время с точностью до секунды форматируется один раз на секунду
+        self._cached_second = None
+        self._cached_second_str = ""
+        
+        # Имя модуля по имени логгера (набор логгеров конечен)
+        self._module_names: Dict[str, str] = {}
     
     def format(self, record):
         """Форматирование записи лога."""
@@ -31,10 +38,16 @@ class ModularFormatter(logging.Formatter):
         reset = self.colors['RESET']
         
         # Извлекаем модуль из имени логгера
-        module_name = self._extract_module_name(record.name)
+        module_name = self._module_names.get(record.name)
+        if module_name is None:
+            module_name = self._module_names[record.name] = self._extract_module_name(record.name)
         
         # Форматируем время
-        timestamp = datetime.fromtimestamp(record.created).strftime('%H:%M:%S.%f')[:-3]
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_second = second
+            self._cached_second_str = datetime.fromtimestamp(second).strftime('%H:%M:%S')
+        timestamp = f"{self._cached_second_str}.{int(record.msecs):03d}"
         
         # Создаем основное сообщение
         formatted = (
@@ -4,6 +4,14 @@ import re
 from typing import List, Any
 from ..exceptions import ValidationError
 
+# Шаблоны компилируются один раз при импорте
+_PRESET_NAME_RE = re.compile(r'[a-zA-Z0-9а-яА-Я\s_-]+')
+_PAIR_RE = re.compile(r'[A-Z0-9]+USDT')
+
+# Допустимые интервалы: множества вместо списка, создаваемого на каждый вызов
+_PRESET_INTERVALS = frozenset(("1s", "1m", "5m", "15m", "1h", "4h", "1d"))
+_PRICE_ALERT_INTERVALS = frozenset(("1m", "5m", "15m", "1h", "4h", "1d"))
+
 
 class PresetValidator:
     """Валидатор данных пресетов."""
@@ -22,7 +30,7 @@ class PresetValidator:
             raise ValidationError("Preset name too long (max 50 characters)")
         
         # Проверяем на недопустимые символы
-        if not re.match(r'^[a-zA-Z0-9а-яА-Я\s_-]+$', name):
+        if not _PRESET_NAME_RE.fullmatch(name):
             raise ValidationError("Preset name contains invalid characters")
         
         return name
@@ -45,7 +53,7 @@ class PresetValidator:
                 raise ValidationError(f"Invalid pair type: {type(pair)}")
             
             pair = pair.strip().upper()
-            if not re.match(r'^[A-Z0-9]+USDT$', pair):
+            if not _PAIR_RE.fullmatch(pair):
                 raise ValidationError(f"Invalid pair format: {pair}")
             
             validated_pairs.append(pair)
@@ -58,8 +66,7 @@ class PresetValidator:
         if not isinstance(interval, str):
             raise ValidationError("Interval must be a string")
         
-        valid_intervals = ["1s", "1m", "5m", "15m", "1h", "4h", "1d"]
-        if interval not in valid_intervals:
+        if interval not in _PRESET_INTERVALS:
             raise ValidationError(f"Invalid interval: {interval}")
         
         return interval
@@ -172,8 +179,7 @@ class PriceAlertsValidator:
     @staticmethod
     def validate_interval(interval: str) -> str:
         """Валидация интервала."""
-        valid_intervals = ["1m", "5m", "15m", "1h", "4h", "1d"]
-        if interval not in valid_intervals:
+        if interval not in _PRICE_ALERT_INTERVALS:
             raise ValidationError(f"Invalid interval: {interval}")
         return interval
     
@@ -0,0 +1,7 @@
+# tests/conftest.py
+"""Общие настройки тестов: корень бота в sys.path, как при запуске main.py."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,43 @@
+# tests/test_price_alerts_handler.py
+"""Тесты разбора ручного ввода в обработчиках Price Alerts."""
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from modules.telegram.handlers.price_alerts_handler import _parse_percent
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2", 2.0),
+    ("2.5", 2.5),
+    ("2,5%", 2.5),
+    ("5 %", 5.0),
+    (" 7% ", 7.0),
+    (".5", 0.5),
+    ("5.", 5.0),
+    ("0.12345", 0.12345),
+    ("+5", 5.0),
+    ("-5", -5.0),
+    ("0005", 5.0),
+    ("100", 100.0),
+])
+def test_parse_percent_accepts(text, expected):
+    assert _parse_percent(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    None,
+    "",
+    ".",
+    "%",
+    "+",
+    "abc",
+    "1e1",
+    "1_0",
+    "5%%",
+    "2.5.1",
+    "1000",
+])
+def test_parse_percent_rejects(text):
+    assert _parse_percent(text) is None
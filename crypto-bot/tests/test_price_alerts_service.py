@@ -0,0 +1,23 @@
+# tests/test_price_alerts_service.py
+"""Тесты сервиса ценовых алертов."""
+
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("orjson")
+
+from modules.price_alerts import service
+
+
+@pytest.mark.parametrize("symbols_count, weight, full_market", [
+    (1, 2, False),
+    (20, 2, False),
+    (21, 40, False),
+    (100, 40, False),
+    (101, 80, True),
+    (2000, 80, True),
+])
+def test_ticker_request_branch(symbols_count, weight, full_market):
+    assert service._symbols_request_weight(symbols_count) == weight
+    assert service._use_full_market(symbols_count) is full_market
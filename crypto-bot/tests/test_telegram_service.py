@@ -0,0 +1,31 @@
+# tests/test_telegram_service.py
+"""Тесты разбиения длинных сообщений Telegram."""
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from modules.telegram.service import _open_tags, _split_message
+
+
+@pytest.mark.parametrize("text", [
+    "<b>" + "x" * 50 + "</b>",
+    "a" * 45 + '<a href="https://example.com">link</a>' + "b" * 30,
+    "x" * 38 + "&amp;" + "y" * 30,
+    "<b>" + "line\n" * 30 + "</b>",
+    "<b><i>" + "z" * 100 + "</i></b>",
+])
+def test_split_message_keeps_html_valid(text):
+    parts = _split_message(text, limit=40)
+    
+    assert len(parts) > 1
+    for part in parts:
+        assert len(part) <= 40
+        # Каждая часть самодостаточна: теги закрыты, разрез не внутри тега или сущности
+        assert not _open_tags(part)
+        assert part.rfind("<") <= part.rfind(">")
+        assert part.rfind("&") <= part.rfind(";")
+
+
+def test_split_message_short_text_untouched():
+    assert _split_message("<b>short</b>", limit=40) == ["<b>short</b>"]